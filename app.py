@@ -1,19 +1,68 @@
+import contextlib
+import io
 import os
+import click
 from flask import Flask, render_template, request, redirect, url_for, session, flash
-from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import (Boolean, Column, DateTime, Index, Integer, MetaData, String, Table, Text, insert, or_,
+                        select)
+from sqlalchemy.orm import defer
 from werkzeug.middleware.proxy_fix import ProxyFix
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from artifact_cache import ArtifactCache
+from assets import AssetPipeline
+from certificates import (FORMATS as CERTIFICATE_FORMATS, CertificateRenderer, CertificateSigner,
+                          InvalidCertificate, UnsupportedText, certificate_filename, normalize_student_name,
+                          pdf_supports)
+from conditional import conditional, version_time
 from config import config
+from content import summarize_content
+from engine_profiles import init_engine_profiles
+from exporter import buffered, gzip_stream, iter_json_export, iter_ndjson_export
+from jobs import JobRunner, job_to_dict
+from images import ImageService
+from importer import IMPORT_EXTENSIONS, ImportFormatError, import_posts, iter_upload_posts
+from metrics import RequestMetrics
+from migrations import MigrationRunner, batched_backfill
+from models import db, Job, Post, SiteSettings
+from page_cache import PageCache
+from pagination import keyset_page
+from post_index import PostTitleIndex
+from replicas import ReplicaRouter
+from precompiled import PrecompiledResponse, IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+from search import SearchIndex
+from uploads import ImageUploads, InvalidUpload
+from service_worker import ServiceWorker
+from settings_cache import SettingsCache
+from stylesheets import build_dynamic_css
+from theme_icons import ThemeIcons
+from versions import VersionRegistry
+from webmanifest import build_web_manifest
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_wtf.csrf import CSRFProtect
 
 
-class Base(DeclarativeBase):
-    pass
-
-
-db = SQLAlchemy(model_class=Base)
+versions = VersionRegistry()
+search_index = SearchIndex()
+jobs = JobRunner()
+migrations = MigrationRunner()
+page_cache = PageCache()
+certificate_cache = ArtifactCache()
+certificate_signer = CertificateSigner()
+replicas = ReplicaRouter()
+service_worker = ServiceWorker()
+asset_pipeline = AssetPipeline()
+images = ImageService()
+image_uploads = ImageUploads()
+theme_icons = ThemeIcons()
+request_metrics = RequestMetrics()
+csrf = CSRFProtect()
+
+# Endpoint -> config key holding its request body limit
+UPLOAD_LIMIT_SETTINGS = {
+    'import_tutorials': 'MAX_IMPORT_CONTENT_LENGTH',
+    'new_post': 'MAX_POST_FORM_CONTENT_LENGTH',
+    'edit_post': 'MAX_POST_FORM_CONTENT_LENGTH',
+}
 
 def create_app(config_name='default'):
     """Application factory function."""
@@ -33,65 +82,231 @@ def create_app(config_name='default'):
     # Setup ProxyFix for HTTPS handling (needed for PythonAnywhere)
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
     
+    # Upload endpoints get a larger body limit; registered first so it applies
+    # before CSRF protection parses the form
+    @app.before_request
+    def apply_upload_limits():
+        setting = UPLOAD_LIMIT_SETTINGS.get(request.endpoint)
+        if setting:
+            request.max_content_length = app.config[setting]
+    
     # Initialize CSRF protection
-    csrf = CSRFProtect(app)
+    csrf.init_app(app)
     
     # Initialize the database with the app
     db.init_app(app)
     
+    # Backend-specific connection setup (SQLite PRAGMAs)
+    init_engine_profiles(app, db)
+    
+    # Opt-in Server-Timing, per-endpoint histograms and the slow-query log
+    request_metrics.init_app(app, db)
+    
+    # Shared cache version counters (settings, posts, ...)
+    versions.init_app(app)
+    
+    # Read replicas for public pages; the latest version bump marks the last write
+    replicas.init_app(app, db, last_write=lambda: max(versions.get('posts'), versions.get('settings')) / 1e9)
+    
+    # Rendered public pages for anonymous visitors
+    page_cache.init_app(app)
+    
+    # Generated certificate files (memory tier in front of a capped disk tier)
+    certificate_cache.init_app(app)
+    
+    # Signed certificate URLs
+    certificate_signer.init_app(app)
+    
+    # Generated service worker and content-hashed static URLs
+    service_worker.init_app(app)
+    
+    # Self-hosted, fingerprinted CSS/JS bundles; post content keeps its classes through purging
+    asset_pipeline.init_app(app, static_url=service_worker.static_url,
+                            content_source=lambda: db.session.execute(db.select(Post.content)).scalars())
+    
+    # Resized WebP/AVIF/JPEG variants of featured images
+    images.init_app(app)
+    
+    # Featured images uploaded from the post forms
+    image_uploads.init_app(app, images)
+    
     return app
 
 # Create the app instance
 # In production, this will use environment variable FLASK_ENV
 app = create_app(os.environ.get('FLASK_ENV', 'development'))
 
-# Database models
-class Post(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(200), nullable=False)
-    content = db.Column(db.Text, nullable=False)
-    featured_image = db.Column(db.String(500), nullable=True)
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-
-    def __repr__(self):
-        return f'<Post {self.id}: {self.title}>'
-
-class SiteSettings(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    blog_title = db.Column(db.String(100), nullable=False, default='Blog CMS')
-    blog_description = db.Column(db.Text, nullable=False, default='Welcome to Our Blog')
-
-    # Color customization fields
-    primary_color = db.Column(db.String(7), nullable=False, default='#667eea')
-    secondary_color = db.Column(db.String(7), nullable=False, default='#764ba2')
-    background_color = db.Column(db.String(7), nullable=False, default='#667eea')
-    overall_background = db.Column(db.String(7), nullable=False, default='#1a1a2e')
-    card_background = db.Column(db.String(7), nullable=False, default='#ffffff')
-    text_color = db.Column(db.String(7), nullable=False, default='#333333')
-    navbar_color = db.Column(db.String(7), nullable=False, default='#000000')
-
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-# Ensure instance directory exists for SQLite database
-os.makedirs('instance', exist_ok=True)
-
-with app.app_context():
-    db.create_all()
-    # Create default site settings if none exist
-    if not SiteSettings.query.first():
-        default_settings = SiteSettings()
-        default_settings.blog_title = 'Blog CMS'
-        default_settings.blog_description = 'Welcome to Our Blog'
-        default_settings.primary_color = '#667eea'
-        default_settings.secondary_color = '#764ba2'
-        default_settings.background_color = '#667eea'
-        default_settings.overall_background = '#1a1a2e'
-        default_settings.card_background = '#ffffff'
-        default_settings.text_color = '#333333'
-        default_settings.navbar_color = '#000000'
-        db.session.add(default_settings)
-        db.session.commit()
+jobs.init_app(app, db, Job)
+migrations.init_app(app, db)
+
+# Frozen table definitions used by migrations; never change one, add a migration instead.
+# The baseline is the schema the app created before versioned migrations (commit 7333bdd),
+# so migration 1 builds the same tables on a new database that existing sites already have.
+baseline_schema = MetaData()
+Table(
+    'post', baseline_schema,
+    Column('id', Integer, primary_key=True),
+    Column('title', String(200), nullable=False),
+    Column('content', Text, nullable=False),
+    Column('featured_image', String(500), nullable=True),
+    Column('created_at', DateTime, nullable=False),
+)
+Table(
+    'site_settings', baseline_schema,
+    Column('id', Integer, primary_key=True),
+    Column('blog_title', String(100), nullable=False),
+    Column('blog_description', Text, nullable=False),
+    *(Column(name, String(7), nullable=False)
+      for name in ('primary_color', 'secondary_color', 'background_color', 'overall_background',
+                   'card_background', 'text_color', 'navbar_color')),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+)
+
+jobs_schema = MetaData()
+Table(
+    'job', jobs_schema,
+    Column('id', Integer, primary_key=True),
+    Column('kind', String(50), nullable=False),
+    Column('status', String(20), nullable=False, index=True),
+    Column('params', Text),
+    Column('progress', Text),
+    Column('result', Text),
+    Column('error', Text),
+    Column('artifact', String(255)),
+    Column('cancel_requested', Boolean, nullable=False),
+    Column('created_at', DateTime, nullable=False),
+    Column('started_at', DateTime),
+    Column('finished_at', DateTime),
+    Column('heartbeat_at', DateTime),
+)
+
+# Schema migrations, applied with `flask db upgrade`; never renumber or edit one that has shipped
+@migrations.migration(1, 'initial tables')
+def create_initial_tables(context):
+    baseline_schema.create_all(context.engine)
+
+@migrations.migration(2, 'site_settings.overall_background')
+def add_overall_background(context):
+    site_settings = Table(
+        'site_settings', MetaData(),
+        Column('overall_background', String(7), nullable=False, default='#1a1a2e'),
+    )
+    context.add_column(site_settings.c.overall_background)
+
+@migrations.migration(3, 'post.updated_at and derived content columns')
+def add_post_derived_columns(context):
+    post = Table(
+        'post', MetaData(),
+        Column('updated_at', DateTime),
+        Column('excerpt', Text),
+        Column('rendered_html', Text),
+        Column('plain_text', Text),
+        Column('word_count', Integer),
+        Column('reading_time', Integer),
+    )
+    for column in post.columns:
+        context.add_column(column)
+
+@migrations.migration(4, 'indexes for listings and duplicate checks')
+def add_hot_path_indexes(context):
+    post = Table(
+        'post', MetaData(),
+        Column('id', Integer, primary_key=True),
+        Column('title', String(200), nullable=False),
+        Column('created_at', DateTime, nullable=False),
+        Index('ix_post_created_at_id', 'created_at', 'id'),
+        Index('ix_post_title', 'title'),
+    )
+    for index in post.indexes:
+        context.create_index(index)
+
+@migrations.migration(5, 'full-text search index')
+def add_search_index(context):
+    search_index.setup(context.engine)
+
+@migrations.migration(6, 'default site settings')
+def seed_site_settings(context):
+    site_settings = Table(
+        'site_settings', MetaData(),
+        Column('id', Integer, primary_key=True),
+        Column('blog_title', String(100), nullable=False),
+        Column('blog_description', Text, nullable=False),
+        *(Column(name, String(7), nullable=False)
+          for name in ('primary_color', 'secondary_color', 'background_color', 'overall_background',
+                       'card_background', 'text_color', 'navbar_color')),
+        Column('created_at', DateTime),
+        Column('updated_at', DateTime),
+    )
+    if context.session.execute(select(site_settings.c.id).limit(1)).first() is None:
+        now = datetime.utcnow()
+        context.session.execute(insert(site_settings).values(
+            blog_title='Blog CMS', blog_description='Welcome to Our Blog',
+            primary_color='#667eea', secondary_color='#764ba2', background_color='#667eea',
+            overall_background='#1a1a2e', card_background='#ffffff', text_color='#333333',
+            navbar_color='#000000', created_at=now, updated_at=now,
+        ))
+
+@migrations.migration(7, 'backfill derived post fields')
+def backfill_post_fields(context):
+    post = Table(
+        'post', MetaData(),
+        Column('id', Integer, primary_key=True),
+        Column('content', Text, nullable=False),
+        Column('excerpt', Text),
+        Column('rendered_html', Text),
+        Column('plain_text', Text),
+        Column('word_count', Integer),
+        Column('reading_time', Integer),
+    )
+    updated = backfill_derived_fields(table=post, on_batch=lambda n: context.echo(f'  {n} posts'))
+    if updated:
+        posts_changed(bodies=True)
+
+@migrations.migration(8, 'background job table')
+def create_job_table(context):
+    jobs_schema.create_all(context.engine)
+
+@migrations.migration(9, 'job.owner')
+def add_job_owner(context):
+    job = Table('job', MetaData(), Column('owner', String(255)))
+    context.add_column(job.c.owner)
+
+def backfill_derived_fields(table=None, batch_size=500, force=False, on_batch=None):
+    """Compute derived Post fields in id-ordered batches, committing after each batch.
+
+    By default only rows that are missing derived data are touched; ``force``
+    recomputes every post (e.g. after changing the excerpt rules). ``table``
+    defaults to the live post table; migrations pass their frozen copy, and
+    only the derived columns it has are written.
+    Returns the number of posts updated.
+    """
+    table = Post.__table__ if table is None else table
+
+    def derive(row):
+        return {name: value for name, value in summarize_content(row.content).items() if name in table.c}
+
+    incomplete = or_(table.c.rendered_html.is_(None), table.c.plain_text.is_(None))
+    return batched_backfill(db.session, table, [table.c.content], derive,
+                            where=None if force else incomplete,
+                            batch_size=batch_size, on_batch=on_batch)
+
+@app.cli.command('backfill-posts')
+@click.option('--batch-size', default=500, show_default=True, help='Posts per transaction.')
+@click.option('--force', is_flag=True, help='Recompute every post, not only incomplete ones.')
+def backfill_posts_command(batch_size, force):
+    """Compute excerpts, rendered HTML and reading stats for existing posts."""
+    updated = backfill_derived_fields(batch_size=batch_size, force=force)
+    posts_changed(bodies=True)
+    click.echo(f'Updated {updated} posts.')
+
+@app.cli.command('rebuild-search')
+def rebuild_search_command():
+    """Re-index every post for full-text search."""
+    if search_index.rebuild(db.engine):
+        click.echo('Search index rebuilt.')
+    else:
+        click.echo('This database keeps its search index up to date itself; nothing to rebuild.')
 
 # Authentication decorator
 def login_required(f):
@@ -102,23 +317,69 @@ def login_required(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
-# Helper function to get site settings
+# Helper function to load the site settings row; defaults (unsaved) until an admin saves them
+def load_site_settings():
+    return SiteSettings.query.first() or SiteSettings.with_defaults()
+
+settings_cache = SettingsCache(versions, load_site_settings)
+certificate_renderer = CertificateRenderer(settings_cache)
+
+# PWA icons in the theme colours, cached per colour pair
+theme_icons.init_app(app, colors=lambda: (settings_cache.get().primary_color,
+                                          settings_cache.get().secondary_color))
+
+# Helper function to get the cached, read-only site settings snapshot
 def get_site_settings():
-    settings = SiteSettings.query.first()
-    if not settings:
-        settings = SiteSettings()
-        settings.blog_title = 'Blog CMS'
-        settings.blog_description = 'Welcome to Our Blog'
-        settings.primary_color = '#667eea'
-        settings.secondary_color = '#764ba2'
-        settings.background_color = '#667eea'
-        settings.overall_background = '#1a1a2e'
-        settings.card_background = '#ffffff'
-        settings.text_color = '#333333'
-        settings.navbar_color = '#000000'
-        db.session.add(settings)
-        db.session.commit()
-    return settings
+    return settings_cache.get()
+
+# Theme stylesheet, rendered and compressed once per settings version
+@settings_cache.memoize
+def compiled_dynamic_styles(settings):
+    return PrecompiledResponse(build_dynamic_css(settings), 'text/css')
+
+# PWA manifest, likewise built once per settings version
+@settings_cache.memoize
+def compiled_web_manifest(settings):
+    return PrecompiledResponse(build_web_manifest(settings, theme_icons.icon_url), 'application/manifest+json')
+
+# (id, title) of every post for the certificate form, reloaded when the 'posts' counter changes
+def load_post_titles():
+    return db.session.query(Post.id, Post.title).order_by(Post.created_at.desc(), Post.id.desc()).all()
+
+post_titles = PostTitleIndex(versions, load_post_titles)
+
+# Cache invalidation for post writes: listings depend on the 'posts' counter,
+# each post page on its own counter plus 'post-bodies' for bulk rewrites
+def posts_changed(*post_ids, bodies=False):
+    versions.bump('posts')
+    for post_id in post_ids:
+        versions.bump(f'post-{post_id}')
+    if bodies:
+        versions.bump('post-bodies')
+
+def listing_versions(**view_args):
+    return settings_cache.version, versions.get('posts')
+
+def post_versions(id):
+    return settings_cache.version, versions.get(f'post-{id}'), versions.get('post-bodies')
+
+# Validators for conditional GET; version counters are bump timestamps, so they double as Last-Modified.
+# The build id and time cover template and asset deploys, which change pages without touching data.
+def listing_validators(**view_args):
+    build, built_at = service_worker.build()
+    parts = listing_versions()
+    return (parts, build), max(filter(None, (version_time(max(parts)), built_at)))
+
+def post_validators(id):
+    from flask import abort
+    # Single primary-key lookup of the timestamps only
+    row = db.session.query(Post.created_at, Post.updated_at).filter(Post.id == id).first()
+    if row is None:
+        abort(404)
+    build, built_at = service_worker.build()
+    parts = post_versions(id)
+    last_modified = max(filter(None, (row.updated_at, row.created_at, version_time(max(parts)), built_at)))
+    return (parts, build), last_modified
 
 # Template context processor to make site settings available to all templates
 @app.context_processor
@@ -127,15 +388,42 @@ def inject_site_settings():
 
 # Public routes
 @app.route('/')
+@replicas.read_only
+@conditional(listing_validators)
+@page_cache.cached(listing_versions)
 def index():
-    posts = Post.query.order_by(Post.created_at.desc()).all()
-    return render_template('index.html', posts=posts)
+    # Only the listing columns are fetched; the content body is never loaded here
+    query = db.session.query(Post.id, Post.title, Post.featured_image, Post.created_at,
+                             Post.excerpt, Post.reading_time)
+    posts, next_cursor = keyset_page(
+        query, Post.created_at, Post.id,
+        cursor=request.args.get('after'),
+        per_page=app.config['POSTS_PER_PAGE'],
+    )
+    return render_template('index.html', posts=posts, next_cursor=next_cursor,
+                           is_first_page=not request.args.get('after'))
 
 @app.route('/post/<int:id>')
+@replicas.read_only
+@conditional(post_validators)
+@page_cache.cached(post_versions)
 def post_detail(id):
-    post = Post.query.get_or_404(id)
+    # The raw body and its search text are not needed: the template renders the precomputed HTML
+    post = Post.query.options(defer(Post.content), defer(Post.plain_text)).filter_by(id=id).first_or_404()
     return render_template('post_detail.html', post=post)
 
+@app.route('/search')
+@replicas.read_only
+def search():
+    query = request.args.get('q', '').strip()
+    page = max(1, request.args.get('page', 1, type=int))
+    
+    results, has_next = [], False
+    if query:
+        results, has_next = search_index.search(db.session, query, page=page,
+                                                per_page=app.config['POSTS_PER_PAGE'])
+    return render_template('search.html', query=query, results=results, page=page, has_next=has_next)
+
 # Admin authentication
 @app.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
@@ -178,20 +466,34 @@ def admin_dashboard():
     posts = Post.query.order_by(Post.created_at.desc()).all()
     return render_template('dashboard.html', posts=posts)
 
+def featured_image_from_form():
+    """The featured image for a submitted post form; an uploaded file wins over the URL field"""
+    upload = request.files.get('featured_image_file')
+    if upload and upload.filename:
+        return image_uploads.save(upload)
+    return request.form.get('featured_image', '').strip() or None
+
 @app.route('/admin/new', methods=['GET', 'POST'])
 @login_required
 def new_post():
     if request.method == 'POST':
         title = request.form['title']
         content = request.form['content']
-        featured_image = request.form.get('featured_image', '').strip() or None
+        try:
+            featured_image = featured_image_from_form()
+        except InvalidUpload as e:
+            # Re-render rather than redirect so the typed title and content survive
+            flash(str(e), 'error')
+            return render_template('new_post.html')
         
         post = Post()
         post.title = title
         post.content = content
+        post.refresh_derived_fields()
         post.featured_image = featured_image
         db.session.add(post)
         db.session.commit()
+        posts_changed(post.id)
         
         flash('Post created successfully!', 'success')
         return redirect(url_for('admin_dashboard'))
@@ -204,10 +506,19 @@ def edit_post(id):
     post = Post.query.get_or_404(id)
     
     if request.method == 'POST':
+        try:
+            featured_image = featured_image_from_form()
+        except InvalidUpload as e:
+            flash(str(e), 'error')
+            return render_template('edit_post.html', post=post)
+        
         post.title = request.form['title']
         post.content = request.form['content']
-        post.featured_image = request.form.get('featured_image', '').strip() or None
+        post.refresh_derived_fields()
+        post.featured_image = featured_image
+        post.updated_at = datetime.utcnow()
         db.session.commit()
+        posts_changed(post.id)
         
         flash('Post updated successfully!', 'success')
         return redirect(url_for('admin_dashboard'))
@@ -220,6 +531,7 @@ def delete_post(id):
     post = Post.query.get_or_404(id)
     db.session.delete(post)
     db.session.commit()
+    posts_changed(id)
     
     flash('Post deleted successfully!', 'success')
     return redirect(url_for('admin_dashboard'))
@@ -227,7 +539,7 @@ def delete_post(id):
 @app.route('/admin/settings', methods=['GET', 'POST'])
 @login_required
 def admin_settings():
-    settings = get_site_settings()
+    settings = load_site_settings()
     
     if request.method == 'POST':
         settings.blog_title = request.form['blog_title']
@@ -239,46 +551,71 @@ def admin_settings():
         settings.card_background = request.form['card_background']
         settings.text_color = request.form['text_color']
         settings.navbar_color = request.form['navbar_color']
+        db.session.add(settings)
         db.session.commit()
+        settings_cache.invalidate()
+        # Render the new icon set now (in parallel) rather than on a visitor's request
+        theme_icons.warm(settings.primary_color, settings.secondary_color)
         
         flash('Settings updated successfully!', 'success')
         return redirect(url_for('admin_settings'))
     
     return render_template('admin_settings.html', settings=settings)
 
+@app.route('/admin/metrics')
+def admin_metrics():
+    """Request and query metrics in Prometheus text format, for admins or a scraper with METRICS_TOKEN"""
+    from flask import Response, abort
+    
+    if not request_metrics.enabled:
+        abort(404)
+    if 'logged_in' not in session and not request_metrics.authorized(request):
+        abort(403)
+    response = Response(request_metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @app.route('/admin/export')
 @login_required
 def export_tutorials():
-    """Export all tutorials as JSON"""
-    import json
-    from flask import Response
+    """Export all tutorials as a streamed JSON (or NDJSON) download, optionally gzipped"""
+    from flask import Response, stream_with_context
     from datetime import datetime
     
-    posts = Post.query.all()
-    tutorials_data = {
-        'export_date': datetime.now().isoformat(),
-        'total_posts': len(posts),
-        'posts': []
-    }
+    export_format = 'ndjson' if request.args.get('format') == 'ndjson' else 'json'
+    compress = request.args.get('gzip') == '1'
     
-    for post in posts:
-        post_data = {
-            'title': post.title,
-            'content': post.content,
-            'featured_image': post.featured_image,
-            'created_at': post.created_at.isoformat() if post.created_at else None
-        }
-        tutorials_data['posts'].append(post_data)
+    total_posts = db.session.query(db.func.count(Post.id)).scalar()
     
-    json_data = json.dumps(tutorials_data, indent=2, ensure_ascii=False)
+    def generate():
+        # Rows are fetched in pages through a streaming cursor, never all at once
+        rows = db.session.execute(
+            db.select(Post.title, Post.content, Post.featured_image, Post.created_at)
+            .order_by(Post.id)
+            .execution_options(yield_per=app.config['EXPORT_BATCH_SIZE'])
+        )
+        if export_format == 'ndjson':
+            chunks = iter_ndjson_export(rows)
+        else:
+            chunks = iter_json_export(rows, total_posts, datetime.now().isoformat())
+        
+        chunks = buffered(chunks)
+        if compress:
+            chunks = gzip_stream(chunks)
+        yield from chunks
+    
+    filename = f'tutorials_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{export_format}'
+    if compress:
+        filename += '.gz'
     
     response = Response(
-        json_data,
-        mimetype='application/json',
-        headers={'Content-Disposition': f'attachment; filename=tutorials_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'}
+        stream_with_context(generate()),
+        mimetype='application/gzip' if compress else (
+            'application/x-ndjson' if export_format == 'ndjson' else 'application/json'),
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
     )
     
-    flash(f'Successfully exported {len(posts)} tutorials!', 'success')
+    flash(f'Successfully exported {total_posts} tutorials!', 'success')
     return response
 
 @app.route('/admin/import', methods=['GET', 'POST'])
@@ -295,84 +632,221 @@ def import_tutorials():
             flash('No file selected!', 'error')
             return redirect(request.url)
         
-        if not file.filename or not file.filename.lower().endswith('.json'):
-            flash('Please upload a JSON file!', 'error')
+        if not file.filename or not file.filename.lower().endswith(IMPORT_EXTENSIONS):
+            flash('Please upload a JSON or NDJSON file (optionally gzipped)!', 'error')
             return redirect(request.url)
         
         import json
-        from datetime import datetime
+        
+        if request.form.get('background'):
+            # Keep the upload with the job and let a worker thread import it
+            job = jobs.create('import', {'filename': file.filename})
+            try:
+                file.save(os.path.join(jobs.job_directory(job.id), 'upload'))
+            except Exception:
+                # Never leave a queued job behind without its input
+                jobs.delete(job)
+                raise
+            jobs.start(job)
+            flash(f'Import queued as job #{job.id}.', 'success')
+            return redirect(url_for('admin_jobs'))
         
         try:
-            # Read and parse JSON file
-            file_content = file.read().decode('utf-8')
-            data = json.loads(file_content)
-            
-            if 'posts' not in data:
-                flash('Invalid file format! Missing posts data.', 'error')
-                return redirect(request.url)
-            
-            imported_count = 0
-            skipped_count = 0
-            
-            for post_data in data['posts']:
-                # Check if required fields exist
-                if not post_data.get('title') or not post_data.get('content'):
-                    skipped_count += 1
-                    continue
-                
-                # Check if post with same title already exists
-                existing_post = Post.query.filter_by(title=post_data['title']).first()
-                if existing_post:
-                    skipped_count += 1
-                    continue
-                
-                # Create new post
-                new_post = Post()
-                new_post.title = post_data['title']
-                new_post.content = post_data['content']
-                new_post.featured_image = post_data.get('featured_image')
-                
-                # Parse created_at if provided, otherwise use current time
-                if post_data.get('created_at'):
-                    try:
-                        new_post.created_at = datetime.fromisoformat(post_data['created_at'].replace('Z', '+00:00'))
-                    except:
-                        new_post.created_at = datetime.utcnow()
-                else:
-                    new_post.created_at = datetime.utcnow()
-                
-                db.session.add(new_post)
-                imported_count += 1
-            
-            db.session.commit()
-            
-            if imported_count > 0:
-                flash(f'Successfully imported {imported_count} tutorials! Skipped {skipped_count} duplicates or invalid entries.', 'success')
-            else:
-                flash(f'No new tutorials imported. Skipped {skipped_count} duplicates or invalid entries.', 'warning')
-            
-            return redirect(url_for('admin_dashboard'))
-            
+            # Parse the upload incrementally and insert in bounded batches
+            report = import_posts(
+                db.session, Post, iter_upload_posts(file.filename, file.stream),
+                batch_size=app.config['IMPORT_BATCH_SIZE'],
+            )
+        except ImportFormatError as e:
+            db.session.rollback()
+            flash(str(e), 'error')
+            return redirect(request.url)
         except json.JSONDecodeError:
+            db.session.rollback()
             flash('Invalid JSON file format!', 'error')
             return redirect(request.url)
         except Exception as e:
+            db.session.rollback()
             flash(f'Error importing tutorials: {str(e)}', 'error')
             return redirect(request.url)
+        finally:
+            # Batches are committed as they go, so even a failed import may have added posts
+            posts_changed()
+        
+        if report.imported > 0:
+            flash(f'Successfully imported {report.imported} tutorials! Skipped {report.skipped} duplicates or invalid entries.', 'success')
+        else:
+            flash(f'No new tutorials imported. Skipped {report.skipped} duplicates or invalid entries.', 'warning')
+        
+        # Show per-row rejections so the admin can fix the source file
+        if report.rejections:
+            return render_template('import_tutorials.html', report=report)
+        
+        return redirect(url_for('admin_dashboard'))
     
     return render_template('import_tutorials.html')
 
+# Background jobs
+@jobs.handler('import')
+def run_import_job(context):
+    try:
+        with open(context.path('upload'), 'rb') as upload:
+            report = import_posts(
+                db.session, Post, iter_upload_posts(context.params['filename'], upload),
+                batch_size=app.config['IMPORT_BATCH_SIZE'],
+                on_progress=lambda report: context.report_progress(
+                    processed=report.processed, imported=report.imported, skipped=report.skipped),
+            )
+    finally:
+        # Batches commit as they go, so even a failed or cancelled import may have added posts
+        posts_changed()
+        with contextlib.suppress(OSError):
+            os.remove(context.path('upload'))
+    return report.to_dict()
+
+@jobs.handler('export')
+def run_export_job(context):
+    export_format = context.params.get('format', 'json')
+    filename = f'tutorials_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{export_format}'
+    if context.params.get('gzip'):
+        filename += '.gz'
+    
+    total_posts = db.session.query(db.func.count(Post.id)).scalar()
+    batch_size = app.config['EXPORT_BATCH_SIZE']
+    
+    def rows_with_progress():
+        # Page by primary key with complete queries so no read cursor stays open
+        # while progress updates are written
+        written = 0
+        last_id = 0
+        while True:
+            batch = db.session.execute(
+                db.select(Post.id, Post.title, Post.content, Post.featured_image, Post.created_at)
+                .where(Post.id > last_id)
+                .order_by(Post.id)
+                .limit(batch_size)
+            ).all()
+            if not batch:
+                break
+            yield from batch
+            written += len(batch)
+            last_id = batch[-1].id
+            context.report_progress(written=written, total=total_posts)
+    
+    rows = rows_with_progress()
+    if export_format == 'ndjson':
+        chunks = iter_ndjson_export(rows)
+    else:
+        chunks = iter_json_export(rows, total_posts, datetime.now().isoformat())
+    chunks = buffered(chunks)
+    if context.params.get('gzip'):
+        chunks = gzip_stream(chunks)
+    
+    with open(context.path(filename), 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    
+    return {'artifact': filename, 'total_posts': total_posts, 'bytes': os.path.getsize(context.path(filename))}
+
+@jobs.handler('backfill')
+def run_backfill_job(context):
+    updated = backfill_derived_fields(
+        batch_size=app.config['IMPORT_BATCH_SIZE'],
+        force=context.params.get('force', False),
+        on_batch=lambda updated: context.report_progress(updated=updated),
+    )
+    posts_changed(bodies=True)
+    return {'updated': updated}
+
+@app.route('/admin/jobs')
+@login_required
+def admin_jobs():
+    jobs.mark_stale()
+    recent_jobs = Job.query.order_by(Job.id.desc()).limit(50).all()
+    return render_template('jobs.html', jobs=[job_to_dict(job) for job in recent_jobs])
+
+@app.route('/admin/jobs/<int:job_id>')
+@login_required
+def admin_job_status(job_id):
+    """Job status for polling"""
+    from flask import jsonify
+    return jsonify(job_to_dict(db.get_or_404(Job, job_id)))
+
+@app.route('/admin/jobs/export', methods=['POST'])
+@login_required
+def enqueue_export_job():
+    job = jobs.submit('export', {
+        'format': 'ndjson' if request.form.get('format') == 'ndjson' else 'json',
+        'gzip': bool(request.form.get('gzip')),
+    })
+    flash(f'Export queued as job #{job.id}.', 'success')
+    return redirect(url_for('admin_jobs'))
+
+@app.route('/admin/jobs/backfill', methods=['POST'])
+@login_required
+def enqueue_backfill_job():
+    job = jobs.submit('backfill', {'force': True})
+    flash(f'Post recalculation queued as job #{job.id}.', 'success')
+    return redirect(url_for('admin_jobs'))
+
+@app.route('/admin/jobs/<int:job_id>/cancel', methods=['POST'])
+@login_required
+def cancel_job(job_id):
+    job = db.get_or_404(Job, job_id)
+    if jobs.cancel(job):
+        flash(f'Cancellation requested for job #{job.id}.', 'success')
+    else:
+        flash(f'Job #{job.id} has already finished.', 'warning')
+    return redirect(url_for('admin_jobs'))
+
+@app.route('/admin/jobs/<int:job_id>/delete', methods=['POST'])
+@login_required
+def delete_job(job_id):
+    job = db.get_or_404(Job, job_id)
+    if job.status in ('queued', 'running'):
+        flash('Cancel the job before deleting it.', 'error')
+    else:
+        jobs.delete(job)
+        flash(f'Job #{job_id} deleted.', 'success')
+    return redirect(url_for('admin_jobs'))
+
+@app.route('/admin/jobs/<int:job_id>/artifact')
+@login_required
+def download_job_artifact(job_id):
+    from flask import send_from_directory, abort
+    job = db.get_or_404(Job, job_id)
+    if not job.artifact:
+        abort(404)
+    return send_from_directory(jobs.job_directory(job.id), job.artifact, as_attachment=True)
+
 @app.route('/certificate')
+@replicas.read_only
+@conditional(listing_validators)
+@page_cache.cached(listing_versions)
 def certificate_form():
     """Display certificate generation form"""
-    posts = Post.query.order_by(Post.created_at.desc()).all()
-    return render_template('certificate_form.html', posts=posts)
+    posts = post_titles.all()
+    typeahead = len(posts) > app.config['CERTIFICATE_SELECT_LIMIT']
+    return render_template('certificate_form.html', posts=() if typeahead else posts,
+                           has_posts=bool(posts), typeahead=typeahead)
+
+@app.route('/certificate/posts')
+@replicas.read_only
+@conditional(listing_validators)
+def certificate_post_search():
+    """Typeahead for the certificate form: posts whose title starts with ?q="""
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    results = post_titles.search(request.args.get('q', ''), limit)
+    return {'results': [{'id': post.id, 'title': post.title} for post in results]}
 
 @app.route('/generate_certificate', methods=['POST'])
+@csrf.exempt  # Public and side-effect free; keeps the form page cacheable
+@replicas.read_only
 def generate_certificate():
-    """Process certificate form and redirect to certificate download"""
-    student_name = request.form['student_name'].strip()
-    post_id = request.form['post_id']
+    """Validate the certificate form and return the certificate in the same response"""
+    student_name = normalize_student_name(request.form.get('student_name', ''))
+    post_id = request.form.get('post_id', '')
+    fmt = request.form.get('format', 'html')
     
     if not student_name:
         flash('Please enter your full name.', 'error')
@@ -382,422 +856,225 @@ def generate_certificate():
         flash('Please select a tutorial.', 'error')
         return redirect(url_for('certificate_form'))
     
+    if fmt not in CERTIFICATE_FORMATS:
+        flash('Unknown certificate format.', 'error')
+        return redirect(url_for('certificate_form'))
+    
     # Validate that post_id is valid and post exists
     try:
         post_id = int(post_id)
-        post = Post.query.get(post_id)
-        if not post:
-            flash('Selected tutorial not found.', 'error')
-            return redirect(url_for('certificate_form'))
     except ValueError:
         flash('Invalid tutorial selection.', 'error')
         return redirect(url_for('certificate_form'))
+    post_title = db.session.query(Post.title).filter(Post.id == post_id).scalar()
+    if post_title is None:
+        flash('Selected tutorial not found.', 'error')
+        return redirect(url_for('certificate_form'))
+    
+    if fmt == 'pdf' and not pdf_supports(student_name, post_title):
+        flash('PDF certificates can only print Latin letters, so this one would come out wrong. '
+              'Please download the HTML certificate instead.', 'error')
+        return redirect(url_for('certificate_form'))
     
-    # Redirect to the existing certificate download route (Flask handles URL encoding)
-    return redirect(url_for('download_certificate', post_id=post_id, student_name=student_name))
+    # The title is already known, so the certificate is served without a redirect or a second query
+    token = certificate_signer.issue(post_id, student_name, date.today())
+    response = serve_certificate(token, post_id, student_name, date.today(), fmt, post_title=post_title)
+    response.headers['Content-Location'] = url_for('signed_certificate', token=token, format=fmt)
+    return response
 
 @app.route('/manifest.json')
+@replicas.read_only
 def serve_manifest():
-    """Serve PWA manifest with proper MIME type"""
-    from flask import send_from_directory
-    return send_from_directory('static', 'manifest.json', mimetype='application/manifest+json')
+    """PWA manifest for the current settings; revalidated by ETag, 304 when unchanged"""
+    return compiled_web_manifest().make_response(request)
+
+def serve_certificate(token, post_id, student_name, issued, fmt, post_title=None):
+    """Serve one certificate from the artifact cache, rendering it on a miss.
+    
+    The database is only read on a cache miss, and not at all when the caller
+    already knows the post title.
+    """
+    from flask import abort, send_file
+    
+    mimetype, extension, _ = CERTIFICATE_FORMATS[fmt]
+    completion_date = issued.strftime('%B %d, %Y')
+    filename = certificate_filename(student_name, extension)
+    
+    # Everything that determines the bytes, all known without touching the database
+    key = certificate_cache.make_key(post_id, versions.get(f'post-{post_id}'), student_name,
+                                     completion_date, settings_cache.version, fmt)
+    body, path = certificate_cache.get(key)
+    
+    if body is None and path is None:
+        if post_title is None:
+            # Only the title is needed, not the whole post row
+            post_title = db.session.query(Post.title).filter(Post.id == post_id).scalar()
+            if post_title is None:
+                abort(404)
+        verify_url = url_for('verify_certificate', token=token, _external=True)
+        try:
+            body, mimetype, extension = certificate_renderer.render(fmt, student_name, post_title,
+                                                                    completion_date, verify_url)
+        except UnsupportedText:
+            # The PDF fonts cannot print this name or title; the HTML certificate can
+            return redirect(url_for('signed_certificate', token=token, format='html'))
+        certificate_cache.put(key, body)
+    
+    # send_file also encodes non-ASCII download names (RFC 6266)
+    response = send_file(path if path is not None else io.BytesIO(body), mimetype=mimetype,
+                         as_attachment=True, download_name=filename, etag=key, conditional=True)
+    
+    # Personal: browsers may keep it but must revalidate
+    response.cache_control.private = True
+    response.cache_control.public = False
+    response.cache_control.no_cache = True
+    response.cache_control.max_age = None
+    return response
+
+@app.route('/certificate/t/<token>')
+@replicas.read_only
+def signed_certificate(token):
+    """Download the certificate named by a signed token"""
+    from flask import abort
+    
+    fmt = request.args.get('format', 'html')
+    if fmt not in CERTIFICATE_FORMATS:
+        abort(404)
+    try:
+        post_id, student_name, issued = certificate_signer.load(token)
+    except InvalidCertificate:
+        abort(404)
+    return serve_certificate(token, post_id, student_name, issued, fmt)
+
+@app.route('/certificate/verify/<token>')
+def verify_certificate(token):
+    """Check that a certificate was issued by this site (signature check only)"""
+    try:
+        post_id, student_name, issued = certificate_signer.load(token)
+    except InvalidCertificate:
+        return {'valid': False}, 404
+    return {
+        'valid': True,
+        'post_id': post_id,
+        'student_name': student_name,
+        'issued': issued.isoformat(),
+    }
 
 @app.route('/certificate/<int:post_id>/<path:student_name>')
+@replicas.read_only
 def download_certificate(post_id, student_name):
-    """Generate and download certificate server-side"""
-    from flask import Response
-    import urllib.parse
-    from datetime import datetime
+    """Legacy certificate URL; issues a token for today and serves it directly"""
+    from flask import abort
     
-    post = Post.query.get_or_404(post_id)
-    settings = get_site_settings()
+    fmt = request.args.get('format', 'html')
+    if fmt not in CERTIFICATE_FORMATS:
+        abort(404)
     
     # Flask automatically decodes the URL path parameter
-    # student_name is already decoded by Flask
-    completion_date = datetime.now().strftime('%B %d, %Y')
-    
-    certificate_html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Certificate - {student_name}</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
-    <style>
-        body {{
-            font-family: 'Times New Roman', serif;
-            background: linear-gradient(135deg, {settings.background_color} 0%, {settings.secondary_color} 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }}
-        
-        .certificate {{
-            max-width: 800px;
-            margin: 50px auto;
-            background: white;
-            padding: 60px;
-            border: 8px solid {settings.primary_color};
-            position: relative;
-            box-shadow: 0 20px 40px rgba(0, 0, 0, 0.1);
-        }}
-        
-        .certificate::before {{
-            content: '';
-            position: absolute;
-            top: 20px;
-            left: 20px;
-            right: 20px;
-            bottom: 20px;
-            border: 3px solid {settings.secondary_color};
-            pointer-events: none;
-        }}
-        
-        .certificate-header {{
-            text-align: center;
-            margin-bottom: 40px;
-        }}
-        
-        .certificate-title {{
-            font-size: 3rem;
-            font-weight: bold;
-            color: {settings.primary_color};
-            margin-bottom: 10px;
-            letter-spacing: 3px;
-        }}
-        
-        .certificate-subtitle {{
-            font-size: 1.2rem;
-            color: {settings.secondary_color};
-            margin-bottom: 30px;
-        }}
-        
-        .student-name {{
-            font-size: 2.5rem;
-            font-weight: bold;
-            color: {settings.secondary_color};
-            text-decoration: underline;
-            text-decoration-color: {settings.primary_color};
-            margin: 20px 0;
-        }}
-        
-        .tutorial-title {{
-            font-size: 1.8rem;
-            font-style: italic;
-            color: {settings.primary_color};
-            margin: 20px 0;
-        }}
-        
-        .completion-text {{
-            font-size: 1.1rem;
-            line-height: 1.8;
-            text-align: center;
-            margin: 30px 0;
-        }}
-        
-        .date-signature {{
-            display: flex;
-            justify-content: space-between;
-            margin-top: 60px;
-        }}
-        
-        .signature-line {{
-            text-align: center;
-            min-width: 200px;
-        }}
-        
-        .signature-line hr {{
-            border: 2px solid {settings.primary_color};
-            margin: 10px 0;
-        }}
-        
-        .signature-line small {{
-            color: {settings.secondary_color};
-            font-size: 0.9rem;
-        }}
-    </style>
-</head>
-<body>
-    <div class="certificate">
-        <div class="certificate-header">
-            <h1 class="certificate-title">CERTIFICATE</h1>
-            <h2 class="certificate-subtitle">of Achievement</h2>
-        </div>
+    student_name = normalize_student_name(student_name)
+    if not student_name:
+        abort(404)
+    issued = date.today()
+    token = certificate_signer.issue(post_id, student_name, issued)
+    return serve_certificate(token, post_id, student_name, issued, fmt)
+
+@app.route('/admin/certificates/batch', methods=['GET', 'POST'])
+@login_required
+def batch_certificates():
+    """Generate a zip of certificates for a list of names"""
+    from flask import Response
+    
+    if request.method == 'POST':
+        # Normalized once, so the printed name and the one in the signed token always match
+        names = [name for name in map(normalize_student_name, request.form.get('names', '').splitlines()) if name]
+        fmt = request.form.get('format', 'html')
+        post_title = db.session.query(Post.title).filter(Post.id == request.form.get('post_id', type=int)).scalar()
         
-        <div class="certificate-content text-center">
-            <p class="completion-text">This is to certify that</p>
-            
-            <h2 class="student-name">{student_name}</h2>
+        if post_title is None:
+            flash('Please select a tutorial.', 'error')
+        elif not names:
+            flash('Please enter at least one name.', 'error')
+        elif len(names) > app.config['CERTIFICATE_BATCH_LIMIT']:
+            flash(f'At most {app.config["CERTIFICATE_BATCH_LIMIT"]} names per batch.', 'error')
+        elif fmt not in CERTIFICATE_FORMATS:
+            flash('Unknown certificate format.', 'error')
+        elif fmt == 'pdf' and not pdf_supports(post_title, *names):
+            unsupported = [name for name in names if not pdf_supports(name)] or [f'the title "{post_title}"']
+            flash('PDF certificates can only print Latin letters; use the HTML format for '
+                  + ', '.join(unsupported[:10]) + ('...' if len(unsupported) > 10 else '') + '.', 'error')
+        else:
+            post_id = request.form.get('post_id', type=int)
+            issued = date.today()
             
-            <p class="completion-text">has successfully completed the tutorial</p>
+            def verify_url_for(name):
+                token = certificate_signer.issue(post_id, name, issued)
+                return url_for('verify_certificate', token=token, _external=True)
             
-            <h3 class="tutorial-title">"{post.title}"</h3>
+            archive, rate = certificate_renderer.render_batch(fmt, names, post_title, issued.strftime('%B %d, %Y'),
+                                                              verify_url_for)
+            app.logger.info('Rendered %d %s certificates at %.0f certificates/s', len(names), fmt, rate)
             
-            <p class="completion-text">
-                and has demonstrated proficiency in the subject matter<br>
-                on this day of <strong>{completion_date}</strong>
-            </p>
-        </div>
+            response = Response(archive, mimetype='application/zip')
+            response.headers['Content-Disposition'] = f'attachment; filename="certificates-{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip"'
+            response.headers['X-Certificates-Per-Second'] = f'{rate:.1f}'
+            return response
         
-        <div class="date-signature">
-            <div class="signature-line">
-                <hr>
-                <small>Date</small>
-            </div>
-            <div class="signature-line">
-                <hr>
-                <small>Tutorial Platform</small>
-            </div>
-        </div>
-    </div>
-</body>
-</html>
-    """
+        return redirect(url_for('batch_certificates'))
     
-    response = Response(certificate_html, mimetype='text/html')
-    response.headers['Content-Disposition'] = f'attachment; filename="certificate-{student_name.replace(" ", "-").lower()}.html"'
-    return response
+    return render_template('certificate_batch.html', posts=post_titles.all(), formats=CERTIFICATE_FORMATS,
+                           batch_limit=app.config['CERTIFICATE_BATCH_LIMIT'])
+
+@app.cli.command('bench-certificates')
+@click.option('--count', default=1000, show_default=True, help='Certificates to render.')
+@click.option('--format', 'fmt', type=click.Choice(sorted(CERTIFICATE_FORMATS)), default='html', show_default=True)
+def bench_certificates_command(count, fmt):
+    """Measure certificate rendering throughput."""
+    names = [f'Student Number {i}' for i in range(count)]
+    archive, rate = certificate_renderer.render_batch(fmt, names, 'Benchmark Tutorial', 'January 01, 2025')
+    click.echo(f'{count} {fmt} certificates: {rate:.0f} certificates/s ({len(archive)} bytes zipped)')
 
 @app.route('/dynamic-styles.css')
+@replicas.read_only
 def dynamic_styles():
-    settings = get_site_settings()
-    
-    css_content = f"""
-/* Dynamic styles based on admin settings */
-body.mobile-app-body {{
-    background: {settings.overall_background} !important;
-    background-attachment: fixed;
-    transition: background-color 0.8s ease-in-out;
-}}
-
-.gradient-bg {{
-    background: linear-gradient(135deg, {settings.background_color} 0%, {settings.secondary_color} 100%);
-    animation: gradientShift 8s ease-in-out infinite;
-}}
-
-@keyframes gradientShift {{
-    0%, 100% {{ background: linear-gradient(135deg, {settings.background_color} 0%, {settings.secondary_color} 100%); }}
-    50% {{ background: linear-gradient(135deg, {settings.secondary_color} 0%, {settings.primary_color} 100%); }}
-}}
-
-.btn-gradient {{
-    background: linear-gradient(45deg, {settings.primary_color}, {settings.secondary_color});
-    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-    position: relative;
-    overflow: hidden;
-}}
-
-.btn-gradient::before {{
-    content: '';
-    position: absolute;
-    top: 0;
-    left: -100%;
-    width: 100%;
-    height: 100%;
-    background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-    transition: left 0.6s ease;
-}}
-
-.btn-gradient:hover::before {{
-    left: 100%;
-}}
-
-.btn-gradient:hover {{
-    background: linear-gradient(45deg, {settings.secondary_color}, {settings.primary_color});
-    transform: translateY(-2px) scale(1.02);
-    box-shadow: 0 10px 25px rgba({hex_to_rgb(settings.primary_color)}, 0.3);
-}}
-
-.blog-card {{
-    background: rgba({hex_to_rgb(settings.card_background)}, 0.95);
-    backdrop-filter: blur(10px);
-    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-}}
-
-.blog-card:hover {{
-    transform: translateY(-8px) rotateX(2deg);
-    box-shadow: 0 20px 40px rgba({hex_to_rgb(settings.primary_color)}, 0.2);
-}}
-
-.navbar-dark {{
-    background: rgba({hex_to_rgb(settings.navbar_color)}, 0.9) !important;
-    backdrop-filter: blur(20px);
-    transition: all 0.3s ease;
-}}
-
-.mobile-header {{
-    background: rgba({hex_to_rgb(settings.card_background)}, 0.95) !important;
-    backdrop-filter: blur(20px);
-    transition: all 0.3s ease;
-}}
-
-.bottom-nav {{
-    background: rgba({hex_to_rgb(settings.card_background)}, 0.95) !important;
-    backdrop-filter: blur(20px);
-    transition: all 0.3s ease;
-}}
-
-.nav-item {{
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-}}
-
-.nav-item:hover {{
-    transform: translateY(-3px) scale(1.05);
-}}
-
-.nav-item.active {{
-    background: linear-gradient(45deg, {settings.primary_color}, {settings.secondary_color});
-    color: white !important;
-    border-radius: 15px;
-    box-shadow: 0 8px 20px rgba({hex_to_rgb(settings.primary_color)}, 0.3);
-}}
-
-.certificate {{
-    border: 3px solid {settings.primary_color};
-    transition: all 0.3s ease;
-}}
-
-.certificate:hover {{
-    transform: scale(1.02);
-    box-shadow: 0 15px 35px rgba({hex_to_rgb(settings.primary_color)}, 0.2);
-}}
-
-.certificate::before {{
-    border: 2px solid {settings.secondary_color};
-}}
-
-.certificate-header h2 {{
-    color: {settings.primary_color};
-    animation: glow 2s ease-in-out infinite alternate;
-}}
-
-@keyframes glow {{
-    from {{ text-shadow: 0 0 5px rgba({hex_to_rgb(settings.primary_color)}, 0.5); }}
-    to {{ text-shadow: 0 0 20px rgba({hex_to_rgb(settings.primary_color)}, 0.8); }}
-}}
-
-.student-name {{
-    color: {settings.secondary_color} !important;
-    text-decoration-color: {settings.primary_color};
-    animation: pulse 2s ease-in-out infinite;
-}}
-
-@keyframes pulse {{
-    0%, 100% {{ transform: scale(1); }}
-    50% {{ transform: scale(1.02); }}
-}}
-
-.tutorial-title {{
-    color: {settings.primary_color} !important;
-}}
-
-.signature-line hr {{
-    border: 1px solid {settings.primary_color};
-}}
-
-.signature-line small {{
-    color: {settings.secondary_color};
-}}
-
-.form-control {{
-    border: 2px solid rgba({hex_to_rgb(settings.primary_color)}, 0.3);
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-}}
-
-.form-control:focus {{
-    border-color: {settings.primary_color};
-    box-shadow: 0 0 0 0.2rem rgba({hex_to_rgb(settings.primary_color)}, 0.25);
-    transform: scale(1.02);
-}}
-
-.text-primary {{
-    color: {settings.text_color} !important;
-}}
-
-.card-title {{
-    color: {settings.text_color};
-    transition: color 0.3s ease;
-}}
-
-.post-content {{
-    color: {settings.text_color};
-    line-height: 1.8;
-    transition: all 0.3s ease;
-}}
-
-.mobile-alert {{
-    animation: slideInDown 0.5s ease-out;
-}}
-
-@keyframes slideInDown {{
-    from {{
-        transform: translateY(-100%);
-        opacity: 0;
-    }}
-    to {{
-        transform: translateY(0);
-        opacity: 1;
-    }}
-}}
-
-.featured-image {{
-    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-}}
-
-.featured-image:hover {{
-    transform: scale(1.05);
-}}
-
-/* Floating animation for icons */
-.nav-item i {{
-    animation: float 3s ease-in-out infinite;
-}}
-
-@keyframes float {{
-    0%, 100% {{ transform: translateY(0px); }}
-    50% {{ transform: translateY(-5px); }}
-}}
-
-/* Ripple effect for buttons */
-.btn-gradient {{
-    position: relative;
-    overflow: hidden;
-}}
-
-.btn-gradient:active::after {{
-    content: '';
-    position: absolute;
-    top: 50%;
-    left: 50%;
-    width: 0;
-    height: 0;
-    border-radius: 50%;
-    background: rgba(255, 255, 255, 0.5);
-    transform: translate(-50%, -50%);
-    animation: ripple 0.6s ease-out;
-}}
-
-@keyframes ripple {{
-    to {{
-        width: 300px;
-        height: 300px;
-        opacity: 0;
-    }}
-}}
-
-/* Smooth transitions for all interactive elements */
-* {{
-    transition: color 0.3s ease, background-color 0.3s ease, border-color 0.3s ease, transform 0.3s ease;
-}}
-"""
+    stylesheet = compiled_dynamic_styles()
     
-    from flask import Response
-    return Response(css_content, mimetype='text/css')
+    # Versioned URLs emitted by base.html never change content, so they can be cached forever
+    if request.args.get('v') == str(settings_cache.version):
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        cache_control = REVALIDATE_CACHE_CONTROL
+    return stylesheet.make_response(request, cache_control=cache_control)
+
+@app.route('/service-worker.js')
+def service_worker_script():
+    """The site's service worker; revalidated on every update check, 304 when unchanged"""
+    response = service_worker.compiled().make_response(request, cache_control='no-cache')
+    response.headers['Service-Worker-Allowed'] = '/'
+    return response
+
+@app.route('/assets/<path:filename>')
+def assets_file(filename):
+    """Built, content-hashed bundles and fonts, served precompressed with immutable caching"""
+    return asset_pipeline.send(filename)
+
+@app.route('/icons/<colors>/<filename>')
+@replicas.read_only
+def theme_icon(colors, filename):
+    """PWA icon in the current theme colours; the URL names the colours, so it never changes"""
+    return theme_icons.send(request, colors, filename)
+
+@app.route('/uploads/<name>')
+def uploaded_image(name):
+    """An uploaded featured image, addressed by its content hash"""
+    return image_uploads.send(name)
 
-def hex_to_rgb(hex_color):
-    """Convert hex color to RGB values for rgba usage"""
-    hex_color = hex_color.lstrip('#')
-    return ', '.join(str(int(hex_color[i:i+2], 16)) for i in (0, 2, 4))
+@app.route('/images/<token>/<variant>.<fmt>')
+def image_variant(token, variant, fmt):
+    """A featured image resized and re-encoded once, then served from the image cache"""
+    return images.send(token, variant, fmt)
 
 if __name__ == '__main__':
+    # Development server: bring the schema up to date (production runs `flask db upgrade`)
+    with app.app_context():
+        migrations.upgrade()
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
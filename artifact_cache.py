@@ -0,0 +1,138 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+class MemoryLRU:
+    """Thread-safe LRU mapping bounded by total size; ``size(value)`` defaults to ``len``"""
+
+    def __init__(self, max_bytes, size=len):
+        self.max_bytes = max_bytes
+        self.size = size
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        size = self.size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= self.size(previous)
+            self._entries[key] = value
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= self.size(evicted)
+
+
+class ArtifactCache:
+    """Content-addressed cache of generated files: an in-memory tier in front of a disk tier.
+
+    Entries are addressed by a hash of the inputs that fully determine their
+    bytes, so the hash doubles as a strong ETag. The disk tier is shared by all
+    workers on the host and capped in size; hits refresh a file's mtime and
+    eviction removes the least recently used files first.
+    """
+
+    def __init__(self, app=None, name='certificate'):
+        self.name = name
+        self.directory = None
+        self.max_disk_bytes = 0
+        self.memory = MemoryLRU(0)
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configured by <NAME>_CACHE_DIR, <NAME>_CACHE_MAX_BYTES and <NAME>_MEMORY_CACHE_BYTES"""
+        prefix = self.name.upper()
+        self.directory = (app.config.get(f'{prefix}_CACHE_DIR')
+                          or os.path.join(app.instance_path, f'{self.name}s'))
+        self.max_disk_bytes = app.config.get(f'{prefix}_CACHE_MAX_BYTES', 256 * 1024 * 1024)
+        self.memory = MemoryLRU(app.config.get(f'{prefix}_MEMORY_CACHE_BYTES', 16 * 1024 * 1024))
+        app.extensions[f'{self.name}_cache'] = self
+
+    @staticmethod
+    def make_key(*parts):
+        return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """Return (bytes or None, path or None) for a cached artifact.
+
+        A memory hit returns the bytes; a disk hit returns the path so the
+        file can be streamed without reading it into the worker.
+        """
+        body = self.memory.get(key)
+        if body is not None:
+            return body, None
+
+        path = self.path_for(key)
+        try:
+            # Mark the file as recently used for LRU eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None, None
+        return None, path
+
+    def put(self, key, body):
+        self.memory.set(key, body)
+
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_size()
+            else:
+                self._disk_bytes += len(body)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._disk_bytes = self._evict()
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat
+
+    def _scan_size(self):
+        return sum(stat.st_size for _, stat in self._files())
+
+    def _evict(self):
+        """Delete least recently used files until the tier is 90% of its cap"""
+        files = sorted(self._files(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in files)
+        target = self.max_disk_bytes * 0.9
+        for path, stat in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= stat.st_size
+        return total
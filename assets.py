@@ -0,0 +1,438 @@
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+import urllib.request
+import click
+from flask import abort, request, send_from_directory, url_for
+from flask.cli import AppGroup
+from precompiled import ENCODING_SUFFIXES, IMMUTABLE_CACHE_CONTROL, compress_variants, pick_encoding
+
+
+# Third-party files, pinned to the versions the templates were built against:
+# name -> (URL, Subresource Integrity hash of the exact file). Fetch and build
+# refuse a file whose hash differs or that has no hash pinned yet; see
+# ``flask assets hashes`` for recording one after checking a file by hand.
+VENDOR_FILES = {
+    'bootstrap.min.css': (
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css',
+        'sha384-1BmE4kWBq78iYhFldvKuhfTAU6auU8tT94WrHftjDbrCEXSU1oBoqyl2QvZ6jIW3'),
+    'bootstrap.bundle.min.js': (
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js',
+        'sha384-ka7Sk0Gln4gmtz2MlQnikT1wXgYsOg+OMhuP+IlRH9sENBO0LRn5q+8nbTov4+1p'),
+    # Not pinned yet: verify against the upstream release and fill in the hash
+    'animate.min.css': ('https://cdnjs.cloudflare.com/ajax/libs/animate.css/4.1.1/animate.min.css', None),
+    'fontawesome/css/all.min.css': (
+        'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css', None),
+}
+for _font in ('fa-solid-900', 'fa-regular-400', 'fa-brands-400', 'fa-v4compatibility'):
+    for _ext in ('woff2', 'ttf'):
+        VENDOR_FILES[f'fontawesome/webfonts/{_font}.{_ext}'] = (
+            f'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/webfonts/{_font}.{_ext}', None)
+
+# Output bundles and their sources: 'vendor:<name>' or 'static:<path in the static folder>'
+BUNDLES = {
+    'site.css': ('vendor:bootstrap.min.css', 'vendor:animate.min.css',
+                 'vendor:fontawesome/css/all.min.css', 'static:css/style.css'),
+    'site.js': ('vendor:bootstrap.bundle.min.js',),
+}
+
+# Classes only ever added by Bootstrap's JavaScript, never written in templates
+JS_STATE_CLASSES = {
+    'show', 'showing', 'hide', 'hiding', 'fade', 'collapse', 'collapsing', 'collapse-horizontal',
+    'active', 'disabled', 'modal-open', 'modal-backdrop', 'modal-static', 'offcanvas-backdrop',
+    'tooltip', 'popover', 'bs-tooltip-auto', 'bs-popover-auto', 'dropdown-menu-end', 'was-validated',
+}
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.ttf')
+
+CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+CSS_STRING = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+CSS_COMMENT = re.compile(r'/\*(?!!).*?\*/', re.DOTALL)
+CSS_CLASS = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+CSS_NOT = re.compile(r':not\([^)]*\)')
+CSS_ANIMATION = re.compile(r'animation(?:-name)?\s*:\s*([^;}]+)')
+TOKEN = re.compile(r'[\w-]+')
+# Template expressions that build class names, e.g. alert-{{ category }}
+CLASS_PREFIX = re.compile(r'([\w-]+-)\{\{')
+HTML_CLASS_ATTR = re.compile(r'class\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+GROUPING_AT_RULES = ('@media', '@supports', '@layer', '@container', '@document')
+KEYFRAMES = re.compile(r'@(-\w+-)?keyframes\b')
+
+
+def minify_css(css):
+    """Strip comments (except /*! licences) and redundant whitespace, leaving strings intact"""
+    css = CSS_COMMENT.sub('', css)
+    parts = CSS_STRING.split(css)
+    for index in range(0, len(parts), 2):
+        code = re.sub(r'\s+', ' ', parts[index])
+        code = re.sub(r'\s*([{};,>])\s*', r'\1', code)
+        code = re.sub(r':\s+', ':', code)
+        parts[index] = code.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def _split_top_level(text, separator):
+    """Split on ``separator`` outside parentheses and brackets"""
+    items, depth, start = [], 0, 0
+    for index, char in enumerate(text):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == separator and depth == 0:
+            items.append(text[start:index])
+            start = index + 1
+    items.append(text[start:])
+    return items
+
+
+def _parse_blocks(css):
+    """Yield (prelude, body) for each top-level rule; body is None for statements like @import"""
+    index, length = 0, len(css)
+    while index < length:
+        brace = css.find('{', index)
+        semicolon = css.find(';', index)
+        if brace == -1:
+            rest = css[index:].strip()
+            if rest:
+                yield rest.rstrip(';'), None
+            return
+        if css.startswith('@', index) and semicolon != -1 and semicolon < brace:
+            yield css[index:semicolon].strip(), None
+            index = semicolon + 1
+            continue
+
+        depth, position, quote = 0, brace, None
+        while position < length:
+            char = css[position]
+            if quote:
+                if char == '\\':
+                    position += 1
+                elif char == quote:
+                    quote = None
+            elif char in '"\'':
+                quote = char
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+            position += 1
+        yield css[index:brace].strip(), css[brace + 1:position]
+        index = position + 1
+
+
+class CSSPurger:
+    """Drops style rules whose selectors use classes that appear nowhere in the site.
+
+    A selector is kept when every class it names is a known token or starts
+    with a known prefix; classes inside :not() never cause a selector to be
+    dropped. @keyframes are kept only if a surviving rule animates with them.
+    """
+
+    def __init__(self, tokens, prefixes=()):
+        self.tokens = set(tokens)
+        self.prefixes = tuple(prefixes)
+
+    def _class_used(self, name):
+        return name in self.tokens or name.startswith(self.prefixes)
+
+    def _keep_selector(self, selector):
+        return all(self._class_used(name) for name in CSS_CLASS.findall(CSS_NOT.sub('', selector)))
+
+    def _purge_rules(self, css, keyframes=None):
+        """Return the kept rules as a list; top-level @keyframes become placeholders"""
+        out = []
+        for prelude, body in _parse_blocks(css):
+            if body is None:
+                out.append(prelude + ';')
+            elif prelude.startswith(GROUPING_AT_RULES):
+                inner = ''.join(self._purge_rules(body))
+                if inner:
+                    out.append(f'{prelude}{{{inner}}}')
+            elif keyframes is not None and KEYFRAMES.match(prelude):
+                keyframes.append((len(out), prelude.split()[-1], f'{prelude}{{{body}}}'))
+                out.append('')
+            elif prelude.startswith('@'):
+                out.append(f'{prelude}{{{body}}}')
+            else:
+                selectors = [s for s in _split_top_level(prelude, ',') if self._keep_selector(s)]
+                if selectors:
+                    out.append(f'{",".join(selectors)}{{{body}}}')
+        return out
+
+    def purge(self, css):
+        keyframes = []
+        out = self._purge_rules(css, keyframes)
+        animated = set()
+        for value in CSS_ANIMATION.findall(''.join(out)):
+            animated.update(TOKEN.findall(value))
+        for position, name, text in keyframes:
+            if name in animated:
+                out[position] = text
+        return ''.join(out)
+
+
+class AssetPipeline:
+    """Vendored, bundled and fingerprinted static assets.
+
+    ``flask assets fetch`` downloads the pinned third-party files into
+    ``assets/vendor``; fetch and build refuse any file that does not match
+    the integrity hash pinned in ``VENDOR_FILES``. ``flask assets build``
+    bundles them with the site's own CSS, purges unused rules, minifies,
+    writes content-hashed files plus gzip/brotli variants to ``static/dist``
+    and a manifest. Built files are served from /assets/ with an immutable
+    Cache-Control. Until a build exists, ``asset_urls`` falls back to the
+    original CDN and static URLs so development needs no build step.
+    """
+
+    def __init__(self, app=None, static_url=None, content_source=None):
+        self.app = None
+        self.static_url = static_url
+        self.content_source = content_source
+        self.vendor_dir = None
+        self.dist_dir = None
+        self._manifest = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, static_url, content_source)
+
+    def init_app(self, app, static_url=None, content_source=None):
+        """``content_source()`` optionally yields stored HTML whose classes must survive purging"""
+        self.app = app
+        self.static_url = static_url or self.static_url
+        self.content_source = content_source or self.content_source
+        self.vendor_dir = os.path.join(app.root_path, 'assets', 'vendor')
+        self.dist_dir = app.config.get('ASSETS_DIST_DIR') or os.path.join(app.static_folder, 'dist')
+        app.add_template_global(self.asset_url)
+        app.add_template_global(self.asset_urls)
+        app.cli.add_command(self._cli())
+        app.extensions['assets'] = self
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.dist_dir, 'manifest.json')
+
+    def manifest(self):
+        """Logical name -> fingerprinted file name; empty until ``flask assets build`` ran"""
+        if self._manifest is None:
+            with self._lock:
+                if self._manifest is None:
+                    try:
+                        with open(self.manifest_path) as f:
+                            self._manifest = json.load(f)
+                    except FileNotFoundError:
+                        self._manifest = {}
+        return self._manifest
+
+    @property
+    def built(self):
+        return bool(self.manifest())
+
+    def asset_url(self, filename, **values):
+        """Like ``url_for('static', filename=...)`` but for built, fingerprinted assets"""
+        return self.asset_urls(filename, **values)[0]
+
+    def asset_urls(self, filename, **values):
+        """URLs to load for a bundle: one fingerprinted file, or its unbundled sources"""
+        manifest = self.manifest()
+        if filename in manifest:
+            return [url_for('assets_file', filename=manifest[filename], **values)]
+        if filename not in BUNDLES:
+            return [self.static_url(filename)]
+        urls = []
+        for source in BUNDLES[filename]:
+            kind, name = source.split(':', 1)
+            urls.append(VENDOR_FILES[name][0] if kind == 'vendor' else self.static_url(name))
+        return urls
+
+    def precache_urls(self):
+        """Same-origin bundle URLs for the service worker to precache"""
+        manifest = self.manifest()
+        return [url_for('assets_file', filename=manifest[name]) for name in BUNDLES if name in manifest]
+
+    def send(self, filename):
+        """Serve a built file, preferring a precompressed variant the client accepts"""
+        if filename not in set(self.manifest().values()):
+            abort(404)
+        available = [encoding for encoding, suffix in ENCODING_SUFFIXES.items()
+                     if os.path.exists(os.path.join(self.dist_dir, filename + suffix))]
+        encoding = pick_encoding(request, available)
+        if encoding:
+            response = send_from_directory(self.dist_dir, filename + ENCODING_SUFFIXES[encoding],
+                                           mimetype=_mimetype(filename))
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response = send_from_directory(self.dist_dir, filename, mimetype=_mimetype(filename))
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    # Build steps
+
+    def fetch(self, echo=click.echo):
+        """Download missing vendor files and check every file against its pinned hash"""
+        for name, (url, _) in VENDOR_FILES.items():
+            path = os.path.join(self.vendor_dir, name)
+            if not os.path.exists(path):
+                echo(f'Fetching {url}')
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    data = response.read()
+                _verify(name, data)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(data)
+            else:
+                self._read_vendor(name)
+
+    def _read_vendor(self, name):
+        """A vendored file's bytes, after checking them against the pinned hash"""
+        with open(os.path.join(self.vendor_dir, name), 'rb') as f:
+            data = f.read()
+        _verify(name, data)
+        return data
+
+    def _site_tokens(self, extra_html=()):
+        """Every word-like token the templates (and optional extra HTML) could use as a class"""
+        tokens, prefixes = set(JS_STATE_CLASSES), set()
+        template_dir = os.path.join(self.app.root_path, self.app.template_folder)
+        for root, _, names in os.walk(template_dir):
+            for name in names:
+                with open(os.path.join(root, name), encoding='utf-8') as f:
+                    text = f.read()
+                tokens.update(TOKEN.findall(text))
+                prefixes.update(CLASS_PREFIX.findall(text))
+        for html in extra_html:
+            for classes in HTML_CLASS_ATTR.findall(html):
+                tokens.update(classes.split())
+        tokens.update(self.app.config.get('ASSETS_SAFELIST', ()))
+        return tokens, prefixes
+
+    def _read_source(self, source):
+        kind, name = source.split(':', 1)
+        if kind == 'vendor':
+            return kind, name, self._read_vendor(name).decode('utf-8')
+        with open(os.path.join(self.app.static_folder, name), encoding='utf-8') as f:
+            return kind, name, f.read()
+
+    def _write(self, name, data, manifest):
+        stem, ext = os.path.splitext(name)
+        fingerprinted = f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+        path = os.path.join(self.dist_dir, fingerprinted)
+        with open(path, 'wb') as f:
+            f.write(data)
+        if ext in COMPRESSIBLE:
+            for encoding, compressed in compress_variants(data).items():
+                with open(path + ENCODING_SUFFIXES[encoding], 'wb') as f:
+                    f.write(compressed)
+        manifest[name] = fingerprinted
+        return fingerprinted
+
+    def build(self, purge=True, extra_html=(), echo=click.echo):
+        """Write fingerprinted bundles, fonts and the manifest to the dist folder"""
+        os.makedirs(self.dist_dir, exist_ok=True)
+        manifest = {}
+
+        # Fonts first, so stylesheets can point at their fingerprinted names
+        for name in VENDOR_FILES:
+            if '/webfonts/' in name:
+                self._write(os.path.basename(name), self._read_vendor(name), manifest)
+
+        purger = CSSPurger(*self._site_tokens(extra_html)) if purge else None
+        for bundle, sources in BUNDLES.items():
+            parts = []
+            for source in sources:
+                kind, name, text = self._read_source(source)
+                if bundle.endswith('.css'):
+                    text = CSS_URL.sub(lambda m: self._rewrite_url(m, kind, name, manifest), text)
+                    text = minify_css(text)
+                parts.append(text)
+
+            if bundle.endswith('.css'):
+                text = '\n'.join(parts)
+                if purger:
+                    # One pass over the whole bundle, so keyframes used across files survive
+                    before = len(text)
+                    text = purger.purge(text)
+                    echo(f'  purged {bundle}: {before} -> {len(text)} bytes')
+            else:
+                text = ';\n'.join(parts)
+            fingerprinted = self._write(bundle, text.encode('utf-8'), manifest)
+            echo(f'{bundle} -> {fingerprinted}')
+
+        tmp_path = f'{self.manifest_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+        self._manifest = None
+        return manifest
+
+    def _rewrite_url(self, match, kind, name, manifest):
+        """Point relative url()s at fingerprinted fonts or, for the site's own CSS, the static folder"""
+        target = match.group(2)
+        if target.startswith(('data:', 'http:', 'https:', '/', '#')):
+            return match.group(0)
+        filename = os.path.basename(target.split('?')[0].split('#')[0])
+        if filename in manifest:
+            # Bundles and fonts share the dist folder, so a bare name resolves
+            return f'url({manifest[filename]})'
+        if kind == 'static':
+            path = os.path.normpath(os.path.join(os.path.dirname(name), target)).replace(os.sep, '/')
+            return f'url({self.app.static_url_path}/{path})'
+        return match.group(0)
+
+    def _cli(self):
+        group = AppGroup('assets', help='Vendored and fingerprinted static assets.')
+
+        @group.command('fetch')
+        def fetch_command():
+            """Download pinned third-party assets into assets/vendor."""
+            self.fetch()
+
+        @group.command('hashes')
+        def hashes_command():
+            """Print the integrity hash of each vendored file, for pinning in VENDOR_FILES."""
+            for name, (_, pinned) in VENDOR_FILES.items():
+                path = os.path.join(self.vendor_dir, name)
+                if not os.path.exists(path):
+                    click.echo(f'{name}: missing')
+                    continue
+                with open(path, 'rb') as f:
+                    digest = integrity(f.read())
+                status = 'ok' if digest == pinned else ('not pinned' if pinned is None else 'MISMATCH')
+                click.echo(f'{name}: {digest} ({status})')
+
+        @group.command('build')
+        @click.option('--no-purge', is_flag=True, help='Keep every CSS rule.')
+        @click.option('--scan-posts/--no-scan-posts', default=True, show_default=True,
+                      help='Keep classes used inside post content.')
+        def build_command(no_purge, scan_posts):
+            """Bundle, purge, minify, fingerprint and precompress assets."""
+            extra_html = self.content_source() if scan_posts and self.content_source else ()
+            self.build(purge=not no_purge, extra_html=extra_html)
+
+        return group
+
+
+def integrity(data):
+    """Subresource Integrity value (sha384) of ``data``"""
+    return 'sha384-' + base64.b64encode(hashlib.sha384(data).digest()).decode('ascii')
+
+
+def _verify(name, data):
+    """Refuse vendor bytes that do not match the hash pinned in VENDOR_FILES"""
+    pinned = VENDOR_FILES[name][1]
+    if pinned is None:
+        raise click.ClickException(
+            f'{name} has no pinned hash in VENDOR_FILES; check the file and pin it (see `flask assets hashes`)')
+    if integrity(data) != pinned:
+        raise click.ClickException(f'{name} does not match its pinned hash; refusing to use it')
+
+
+def _mimetype(filename):
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: how long a fresh worker process takes to import the
+app and to answer its first request.
+
+Each sample runs in a new interpreter, like a freshly forked gunicorn worker.
+Run `flask db upgrade` first so the first request finds the schema in place.
+
+Usage: python bench_startup.py [--runs N] [--path /]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+SAMPLE = r'''
+import json, sys, time
+start = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+response = app.test_client().get(sys.argv[1])
+served = time.perf_counter()
+print(json.dumps({'import': imported - start, 'first_request': served - imported, 'status': response.status_code}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='fresh processes to start')
+    parser.add_argument('--path', default='/', help='URL requested after import')
+    args = parser.parse_args()
+
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, '-c', SAMPLE, args.path],
+                                check=True, capture_output=True, text=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    statuses = sorted({sample['status'] for sample in samples})
+    print(f'{args.runs} cold starts, GET {args.path} -> {", ".join(map(str, statuses))}')
+    for phase in ('import', 'first_request'):
+        times = [sample[phase] * 1000 for sample in samples]
+        print(f'  {phase:<14} median {statistics.median(times):7.1f} ms'
+              f'   min {min(times):7.1f} ms   max {max(times):7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
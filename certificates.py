@@ -0,0 +1,451 @@
+import io
+import re
+import time
+import unicodedata
+import zipfile
+import zlib
+from datetime import date
+from itsdangerous import BadSignature, URLSafeSerializer
+from jinja2 import Environment
+
+
+CERTIFICATE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Certificate - {{ student_name }}</title>
+    <style>
+        *, *::before, *::after {
+            box-sizing: border-box;
+        }
+
+        body {
+            margin: 0;
+            font-family: 'Times New Roman', serif;
+            background: linear-gradient(135deg, {{ settings.background_color }} 0%, {{ settings.secondary_color }} 100%);
+            min-height: 100vh;
+            padding: 20px;
+        }
+
+        h1, h2, h3, p {
+            margin-top: 0;
+        }
+
+        .text-center {
+            text-align: center;
+        }
+
+        .certificate {
+            max-width: 800px;
+            margin: 50px auto;
+            background: white;
+            padding: 60px;
+            border: 8px solid {{ settings.primary_color }};
+            position: relative;
+            box-shadow: 0 20px 40px rgba(0, 0, 0, 0.1);
+        }
+
+        .certificate::before {
+            content: '';
+            position: absolute;
+            top: 20px;
+            left: 20px;
+            right: 20px;
+            bottom: 20px;
+            border: 3px solid {{ settings.secondary_color }};
+            pointer-events: none;
+        }
+
+        .certificate-header {
+            text-align: center;
+            margin-bottom: 40px;
+        }
+
+        .certificate-title {
+            font-size: 3rem;
+            font-weight: bold;
+            color: {{ settings.primary_color }};
+            margin-bottom: 10px;
+            letter-spacing: 3px;
+        }
+
+        .certificate-subtitle {
+            font-size: 1.2rem;
+            color: {{ settings.secondary_color }};
+            margin-bottom: 30px;
+        }
+
+        .student-name {
+            font-size: 2.5rem;
+            font-weight: bold;
+            color: {{ settings.secondary_color }};
+            text-decoration: underline;
+            text-decoration-color: {{ settings.primary_color }};
+            margin: 20px 0;
+        }
+
+        .tutorial-title {
+            font-size: 1.8rem;
+            font-style: italic;
+            color: {{ settings.primary_color }};
+            margin: 20px 0;
+        }
+
+        .completion-text {
+            font-size: 1.1rem;
+            line-height: 1.8;
+            text-align: center;
+            margin: 30px 0;
+        }
+
+        .date-signature {
+            display: flex;
+            justify-content: space-between;
+            margin-top: 60px;
+        }
+
+        .signature-line {
+            text-align: center;
+            min-width: 200px;
+        }
+
+        .signature-line hr {
+            border: 2px solid {{ settings.primary_color }};
+            margin: 10px 0;
+        }
+
+        .signature-line small {
+            color: {{ settings.secondary_color }};
+            font-size: 0.9rem;
+        }
+
+        .verify-link {
+            margin: 40px 0 0;
+            text-align: center;
+            font-size: 0.75rem;
+            color: #777777;
+            word-break: break-all;
+        }
+
+        .verify-link a {
+            color: inherit;
+        }
+    </style>
+</head>
+<body>
+    <div class="certificate">
+        <div class="certificate-header">
+            <h1 class="certificate-title">CERTIFICATE</h1>
+            <h2 class="certificate-subtitle">of Achievement</h2>
+        </div>
+
+        <div class="certificate-content text-center">
+            <p class="completion-text">This is to certify that</p>
+
+            <h2 class="student-name">{{ student_name }}</h2>
+
+            <p class="completion-text">has successfully completed the tutorial</p>
+
+            <h3 class="tutorial-title">"{{ post_title }}"</h3>
+
+            <p class="completion-text">
+                and has demonstrated proficiency in the subject matter<br>
+                on this day of <strong>{{ completion_date }}</strong>
+            </p>
+        </div>
+
+        <div class="date-signature">
+            <div class="signature-line">
+                <hr>
+                <small>Date</small>
+            </div>
+            <div class="signature-line">
+                <hr>
+                <small>Tutorial Platform</small>
+            </div>
+        </div>
+        {% if verify_url %}
+        <p class="verify-link">Verify this certificate at <a href="{{ verify_url }}">{{ verify_url }}</a></p>
+        {% endif %}
+    </div>
+</body>
+</html>
+"""
+
+# Advance widths (1/1000 em) of the printable ASCII range for the standard PDF fonts
+TIMES_ROMAN_WIDTHS = [
+    250, 333, 408, 500, 500, 833, 778, 333, 333, 333, 500, 564, 250, 333, 250, 278,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 278, 278, 564, 564, 564, 444,
+    921, 722, 667, 667, 722, 611, 556, 722, 722, 333, 389, 722, 611, 889, 722, 722,
+    556, 722, 667, 556, 611, 722, 722, 944, 722, 722, 611, 333, 278, 333, 469, 500,
+    333, 444, 500, 444, 500, 444, 333, 500, 500, 278, 278, 500, 278, 778, 500, 500,
+    500, 500, 333, 389, 278, 500, 500, 722, 500, 500, 444, 480, 200, 480, 541,
+]
+TIMES_BOLD_WIDTHS = [
+    250, 333, 555, 500, 500, 1000, 833, 333, 333, 333, 500, 570, 250, 333, 250, 278,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 333, 333, 570, 570, 570, 500,
+    930, 722, 667, 722, 722, 667, 611, 778, 778, 389, 500, 778, 667, 944, 722, 778,
+    611, 778, 722, 556, 667, 722, 722, 1000, 722, 722, 667, 333, 278, 333, 581, 500,
+    333, 500, 556, 444, 556, 444, 333, 500, 556, 278, 333, 556, 278, 833, 556, 500,
+    556, 556, 444, 389, 333, 556, 500, 722, 500, 500, 444, 394, 220, 394, 520,
+]
+FONTS = {
+    'F1': ('Times-Roman', TIMES_ROMAN_WIDTHS),
+    'F2': ('Times-Bold', TIMES_BOLD_WIDTHS),
+}
+
+# A4 landscape, in points
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+
+
+def _pdf_color(hex_color):
+    hex_color = (hex_color or '#000000').lstrip('#')
+    return ' '.join(f'{int(hex_color[i:i + 2], 16) / 255:.3f}' for i in (0, 2, 4))
+
+
+class UnsupportedText(ValueError):
+    """Text the built-in PDF fonts cannot print (they only cover Windows-1252)"""
+
+
+def pdf_supports(*texts):
+    """Whether every text can be printed with the built-in PDF fonts"""
+    try:
+        for text in texts:
+            text.encode('cp1252')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _pdf_text(text):
+    """Encode text for a WinAnsi PDF string literal; never substitutes characters"""
+    try:
+        data = text.encode('cp1252')
+    except UnicodeEncodeError:
+        raise UnsupportedText(text)
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def _pdf_info_text(text):
+    """Encode text for the document info dictionary, which accepts any Unicode as UTF-16"""
+    return b'<' + ('\ufeff' + text).encode('utf-16-be').hex().upper().encode('ascii') + b'>'
+
+
+def _text_width(text, font, size):
+    widths = FONTS[font][1]
+    total = 0
+    for char in text:
+        code = ord(char)
+        total += widths[code - 32] if 32 <= code < 127 else 500
+    return total * size / 1000
+
+
+def _centered_text(text, font, size, y, color, max_width=PAGE_WIDTH - 160):
+    # Shrink long names and titles until they fit between the borders
+    while size > 8 and _text_width(text, font, size) > max_width:
+        size -= 1
+    x = (PAGE_WIDTH - _text_width(text, font, size)) / 2
+    return (f'BT {color} rg /{font} {size} Tf {x:.2f} {y} Td ('.encode('ascii')
+            + _pdf_text(text) + b') Tj ET\n')
+
+
+class CertificatePDF:
+    """Minimal single-page PDF writer using the standard Times fonts (no embedding).
+
+    Those fonts only cover Windows-1252, so names or titles in other scripts
+    raise UnsupportedText instead of printing as question marks; check with
+    ``pdf_supports`` and offer the HTML certificate for them. The page frame, borders and fixed captions are built once per settings
+    version; each certificate only appends its name, title and date.
+    """
+
+    def __init__(self, settings):
+        self.primary = _pdf_color(settings.primary_color)
+        self.secondary = _pdf_color(settings.secondary_color)
+        text = _pdf_color(settings.text_color)
+
+        parts = [
+            f'{_pdf_color(settings.background_color)} rg 0 0 {PAGE_WIDTH} {PAGE_HEIGHT} re f\n'.encode('ascii'),
+            f'1 1 1 rg 30 30 {PAGE_WIDTH - 60} {PAGE_HEIGHT - 60} re f\n'.encode('ascii'),
+            f'{self.primary} RG 8 w 34 34 {PAGE_WIDTH - 68} {PAGE_HEIGHT - 68} re S\n'.encode('ascii'),
+            f'{self.secondary} RG 3 w 54 54 {PAGE_WIDTH - 108} {PAGE_HEIGHT - 108} re S\n'.encode('ascii'),
+            _centered_text('CERTIFICATE', 'F2', 44, 470, self.primary),
+            _centered_text('of Achievement', 'F1', 18, 440, self.secondary),
+            _centered_text('This is to certify that', 'F1', 16, 395, text),
+            _centered_text('has successfully completed the tutorial', 'F1', 16, 305, text),
+            _centered_text('and has demonstrated proficiency in the subject matter', 'F1', 14, 215, text),
+            # Signature lines and captions
+            f'{self.primary} RG 2 w 140 120 m 340 120 l S 502 120 m 702 120 l S\n'.encode('ascii'),
+            f'BT {self.secondary} rg /F1 12 Tf 225 102 Td (Date) Tj ET\n'.encode('ascii'),
+            f'BT {self.secondary} rg /F1 12 Tf 555 102 Td (Tutorial Platform) Tj ET\n'.encode('ascii'),
+        ]
+        self.text_color = text
+        self.static_stream = b''.join(parts)
+
+    def render(self, student_name, post_title, completion_date, verify_url=None):
+        parts = [
+            self.static_stream,
+            _centered_text(student_name, 'F2', 34, 345, self.secondary),
+            _centered_text(f'"{post_title}"', 'F2', 24, 258, self.primary),
+            _centered_text(f'on this day of {completion_date}', 'F1', 14, 192, self.text_color),
+        ]
+        if verify_url:
+            parts.append(_centered_text(f'Verify at {verify_url}', 'F1', 8, 64, '0.467 0.467 0.467',
+                                        max_width=PAGE_WIDTH - 120))
+        stream = b''.join(parts)
+        return _build_pdf(zlib.compress(stream, 6), title=f'Certificate - {student_name}')
+
+
+def _build_pdf(content, title):
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+         f'/Resources << /Font << /F1 5 0 R /F2 6 0 R >> >> /Contents 4 0 R >>').encode('ascii'),
+        b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(content) + content + b'\nendstream',
+    ]
+    for name, (base_font, _) in FONTS.items():
+        objects.append(f'<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} '
+                       f'/Encoding /WinAnsiEncoding >>'.encode('ascii'))
+    objects.append(b'<< /Title ' + _pdf_info_text(title) + b' /Producer (Blog CMS) >>')
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b'%010d 00000 n \n' % offset)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+              % (len(objects) + 1, len(objects), xref))
+    return out.getvalue()
+
+
+class CompiledCertificate:
+    """Everything needed to render certificates for one settings version"""
+
+    def __init__(self, settings, environment):
+        self.template = environment.from_string(CERTIFICATE_TEMPLATE, globals={'settings': settings})
+        self.pdf = CertificatePDF(settings)
+
+    def render_html(self, student_name, post_title, completion_date, verify_url=None):
+        return self.template.render(student_name=student_name, post_title=post_title,
+                                    completion_date=completion_date, verify_url=verify_url)
+
+    def render_pdf(self, student_name, post_title, completion_date, verify_url=None):
+        return self.pdf.render(student_name, post_title, completion_date, verify_url)
+
+
+FORMATS = {
+    'html': ('text/html', 'html', CompiledCertificate.render_html),
+    'pdf': ('application/pdf', 'pdf', CompiledCertificate.render_pdf),
+}
+
+
+class CertificateRenderer:
+    """Renders certificates from a template compiled once per settings version"""
+
+    def __init__(self, settings_cache):
+        self.environment = Environment(autoescape=True)
+        self.compiled = settings_cache.memoize(self._compile)
+
+    def _compile(self, settings):
+        return CompiledCertificate(settings, self.environment)
+
+    def render(self, fmt, student_name, post_title, completion_date, verify_url=None):
+        """Return (body, mimetype, extension) for one certificate"""
+        mimetype, extension, render = FORMATS[fmt]
+        body = render(self.compiled(), student_name, post_title, completion_date, verify_url)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        return body, mimetype, extension
+
+    def render_batch(self, fmt, names, post_title, completion_date, verify_url_for=None):
+        """Render many certificates into a zip archive.
+
+        ``verify_url_for(name)`` optionally returns the verification link
+        printed on each certificate. Returns (zip bytes, certificates per second).
+        """
+        compiled = self.compiled()
+        _, extension, render = FORMATS[fmt]
+        archive = io.BytesIO()
+        used = set()
+
+        started = time.perf_counter()
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for name in names:
+                verify_url = verify_url_for(name) if verify_url_for else None
+                body = render(compiled, name, post_title, completion_date, verify_url)
+                filename = unique_filename(certificate_filename(name, extension), used)
+                zf.writestr(filename, body)
+        elapsed = time.perf_counter() - started
+
+        rate = len(names) / elapsed if elapsed > 0 else float('inf')
+        return archive.getvalue(), rate
+
+
+class InvalidCertificate(Exception):
+    """Raised for certificate tokens that were not issued by this site"""
+
+
+class CertificateSigner:
+    """Issues and checks compact signed tokens naming a certificate.
+
+    A token carries (post id, student name, issue date) and is signed with the
+    application's SECRET_KEY, so checking one is a single HMAC comparison with
+    no database access.
+    """
+
+    SALT = 'certificate'
+
+    def __init__(self, app=None):
+        self.serializer = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.serializer = URLSafeSerializer(app.config['SECRET_KEY'], salt=self.SALT)
+
+    def issue(self, post_id, student_name, issued):
+        return self.serializer.dumps([post_id, student_name, issued.isoformat()])
+
+    def load(self, token):
+        """Return (post_id, student_name, issued date) or raise InvalidCertificate"""
+        try:
+            post_id, student_name, issued = self.serializer.loads(token)
+            return int(post_id), str(student_name), date.fromisoformat(issued)
+        except (BadSignature, ValueError, TypeError):
+            raise InvalidCertificate(token)
+
+
+def normalize_student_name(student_name):
+    """Canonical form of a name: NFC-normalized with collapsed whitespace"""
+    return ' '.join(unicodedata.normalize('NFC', student_name).split())
+
+
+def _fold_accent(char):
+    # é -> e, but letters with no ASCII base (й, ß, 王) are kept as they are
+    return unicodedata.normalize('NFKD', char).encode('ascii', 'ignore').decode('ascii') or char
+
+
+def certificate_filename(student_name, extension):
+    """Safe download file name for a student's certificate; letters of any script are kept"""
+    folded = ''.join(_fold_accent(char) for char in unicodedata.normalize('NFC', student_name))
+    slug = re.sub(r'[\W_]+', '-', folded.lower()).strip('-') or 'student'
+    return f'certificate-{slug[:80]}.{extension}'
+
+
+def unique_filename(filename, used):
+    base, _, extension = filename.rpartition('.')
+    candidate = filename
+    counter = 2
+    while candidate in used:
+        candidate = f'{base}-{counter}.{extension}'
+        counter += 1
+    used.add(candidate)
+    return candidate
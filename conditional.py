@@ -0,0 +1,62 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from flask import Response, make_response, request, session
+
+
+def version_time(version):
+    """Interpret a version counter (nanoseconds since the epoch) as a naive UTC datetime"""
+    if not version:
+        return None
+    return datetime.fromtimestamp(version / 1e9, tz=timezone.utc).replace(tzinfo=None)
+
+
+def _is_not_modified(etag, last_modified):
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110, 13.2.2)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional(validators):
+    """Answer revalidation requests with 304 before the view runs.
+
+    ``validators(**view_args)`` returns ``(parts, last_modified)``: ``parts``
+    is any hashable description of what the page depends on (version counters,
+    ids) and ``last_modified`` a naive UTC datetime or None. It should be
+    cheap, at most one indexed lookup, and may abort(404) for missing objects.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Pending flashes must be rendered, never answered with 304
+            if request.method not in ('GET', 'HEAD') or '_flashes' in session:
+                return view(*args, **kwargs)
+
+            parts, last_modified = validators(**kwargs)
+            # Admins see extra navigation, so their pages are a different representation
+            audience = 'admin' if session.get('logged_in') else 'public'
+            etag = hashlib.blake2b(
+                repr((request.full_path, audience, parts)).encode('utf-8'), digest_size=12
+            ).hexdigest()
+
+            if _is_not_modified(etag, last_modified):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+            # Let browsers and the service worker keep the page but always revalidate it
+            response.cache_control.no_cache = True
+            if audience == 'admin':
+                response.cache_control.private = True
+            return response
+        return wrapper
+    return decorator
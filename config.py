@@ -1,5 +1,7 @@
 import os
 from datetime import timedelta
+from engine_profiles import engine_options
+from replicas import replica_binds
 
 class Config:
     """Base configuration class."""
@@ -10,10 +12,18 @@ class Config:
     # Database configuration - defaults to SQLite for simplicity
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///blog.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        "pool_recycle": 300,
-        "pool_pre_ping": True,
-    }
+    
+    # Engine tuning: auto (by URL), sqlite, postgresql, mysql, or legacy; see engine_profiles.py
+    DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'auto')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, DATABASE_PROFILE)
+    
+    # Optional read replicas (comma-separated URLs) for read-only public pages
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    SQLALCHEMY_BINDS = replica_binds(DATABASE_REPLICA_URLS, DATABASE_PROFILE)
+    # How long a session that wrote keeps reading from the primary
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+    # Expected worst-case replication lag; all reads use the primary this long after a write
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
     
     # Session configuration
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
@@ -23,8 +33,60 @@ class Config:
     ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD') or 'admin123'
     ADMIN_PASSWORD_HASH = os.environ.get('ADMIN_PASSWORD_HASH')
     
+    # Full-page cache for anonymous visitors (per worker, LRU by total bytes)
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', '1') == '1'
+    PAGE_CACHE_MAX_BYTES = int(os.environ.get('PAGE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    
+    # Number of posts shown per page on the public listing
+    POSTS_PER_PAGE = int(os.environ.get('POSTS_PER_PAGE', 10))
+    
     # File upload configuration
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB limit for file uploads
+    
+    # Tutorial imports are streamed, so they may be much larger than other uploads
+    MAX_IMPORT_CONTENT_LENGTH = int(os.environ.get('MAX_IMPORT_CONTENT_LENGTH', 200 * 1024 * 1024))
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 500))
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+    
+    # Maximum names accepted by the batch certificate endpoint
+    CERTIFICATE_BATCH_LIMIT = int(os.environ.get('CERTIFICATE_BATCH_LIMIT', 1000))
+    
+    # Above this many posts the certificate form uses a typeahead instead of a <select>
+    CERTIFICATE_SELECT_LIMIT = int(os.environ.get('CERTIFICATE_SELECT_LIMIT', 100))
+    
+    # Extra CSS classes `flask assets build` must never purge (comma-separated)
+    ASSETS_SAFELIST = [name.strip() for name in os.environ.get('ASSETS_SAFELIST', '').split(',') if name.strip()]
+    ASSETS_DIST_DIR = os.environ.get('ASSETS_DIST_DIR')  # defaults to static/dist
+    
+    # Generated certificates cache: memory tier plus an LRU-evicted disk tier
+    CERTIFICATE_CACHE_DIR = os.environ.get('CERTIFICATE_CACHE_DIR')  # defaults to instance/certificates
+    CERTIFICATE_CACHE_MAX_BYTES = int(os.environ.get('CERTIFICATE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    CERTIFICATE_MEMORY_CACHE_BYTES = int(os.environ.get('CERTIFICATE_MEMORY_CACHE_BYTES', 16 * 1024 * 1024))
+    
+    # Featured images stored on this site (static files, uploads): resized variants in an LRU-evicted disk cache
+    IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR')  # defaults to instance/images
+    IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    IMAGE_MEMORY_CACHE_BYTES = int(os.environ.get('IMAGE_MEMORY_CACHE_BYTES', 8 * 1024 * 1024))
+    IMAGE_MAX_SOURCE_BYTES = int(os.environ.get('IMAGE_MAX_SOURCE_BYTES', 20 * 1024 * 1024))
+    
+    # Uploaded featured images: stored once per content hash, processed off-request
+    IMAGE_UPLOAD_DIR = os.environ.get('IMAGE_UPLOAD_DIR')  # defaults to instance/uploads
+    IMAGE_UPLOAD_MAX_BYTES = int(os.environ.get('IMAGE_UPLOAD_MAX_BYTES', 25 * 1024 * 1024))
+    IMAGE_UPLOAD_MAX_DIMENSION = int(os.environ.get('IMAGE_UPLOAD_MAX_DIMENSION', 3200))
+    IMAGE_UPLOAD_WORKERS = int(os.environ.get('IMAGE_UPLOAD_WORKERS', 2))
+    # The post forms carry an image plus the title and content
+    MAX_POST_FORM_CONTENT_LENGTH = IMAGE_UPLOAD_MAX_BYTES + 5 * 1024 * 1024
+    
+    # Opt-in Server-Timing headers and /admin/metrics (Prometheus text format)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '0') == '1'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # lets scrapers read /admin/metrics without a session
+    # Log statements slower than this many milliseconds (0 disables the slow-query log)
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 0))
+    
+    # Background jobs (imports, exports, backfills) run on an in-process thread pool
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    JOB_ARTIFACT_DIR = os.environ.get('JOB_ARTIFACT_DIR')  # defaults to instance/jobs
+    JOB_STALE_SECONDS = int(os.environ.get('JOB_STALE_SECONDS', 600))
 
 class DevelopmentConfig(Config):
     """Development configuration."""
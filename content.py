@@ -0,0 +1,202 @@
+import math
+import re
+from html import escape
+from html.parser import HTMLParser
+
+
+EXCERPT_LENGTH = 150
+WORDS_PER_MINUTE = 200
+
+# Elements that never have a closing tag
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+             'link', 'meta', 'source', 'track', 'wbr'}
+
+# Elements whose text is never shown to readers
+HIDDEN_TAGS = {'script', 'style', 'template', 'noscript'}
+
+# Inline formatting kept in excerpts; everything else is reduced to its text
+EXCERPT_TAGS = {'a', 'b', 'strong', 'i', 'em', 'u', 'code', 'mark', 'small', 'sub', 'sup'}
+
+# Block-level elements that separate words when flattened to text
+BLOCK_TAGS = {'p', 'div', 'br', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+              'pre', 'blockquote', 'table', 'tr', 'td', 'th', 'section', 'article', 'hr'}
+
+SAFE_URL = re.compile(r'^(https?:|mailto:|/|#)', re.IGNORECASE)
+WHITESPACE = re.compile(r'\s+')
+
+
+def _format_attrs(attrs):
+    parts = []
+    for name, value in attrs:
+        if value is None:
+            parts.append(f' {name}')
+        else:
+            parts.append(f' {name}="{escape(value, quote=True)}"')
+    return ''.join(parts)
+
+
+class _BalancingParser(HTMLParser):
+    """Re-serialize HTML so every opened element is closed and stray end tags are dropped"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.out = []
+        self.stack = []
+
+    def handle_starttag(self, tag, attrs):
+        self.out.append(f'<{tag}{_format_attrs(attrs)}>')
+        if tag not in VOID_TAGS:
+            self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.out.append(f'<{tag}{_format_attrs(attrs)}>')
+
+    def handle_endtag(self, tag):
+        if tag not in self.stack:
+            return
+        while self.stack:
+            open_tag = self.stack.pop()
+            self.out.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        self.out.append(data)
+
+    def handle_entityref(self, name):
+        self.out.append(f'&{name};')
+
+    def handle_charref(self, name):
+        self.out.append(f'&#{name};')
+
+    def handle_comment(self, data):
+        self.out.append(f'<!--{data}-->')
+
+    def handle_decl(self, decl):
+        self.out.append(f'<!{decl}>')
+
+    def close(self):
+        super().close()
+        while self.stack:
+            self.out.append(f'</{self.stack.pop()}>')
+        return ''.join(self.out)
+
+
+class _ExcerptParser(HTMLParser):
+    """Collect visible text and a sanitized, length-limited excerpt in one pass"""
+
+    def __init__(self, limit):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.text = []
+        self.excerpt = []
+        self.stack = []
+        self.hidden_depth = 0
+        self.visible_length = 0
+        self.at_space = False
+        self.truncated = False
+
+    def _separate(self):
+        if self.text and not self.text[-1].endswith(' '):
+            self.text.append(' ')
+        if not self.truncated and self.visible_length and not self.at_space:
+            self.excerpt.append(' ')
+            self.visible_length += 1
+            self.at_space = True
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HIDDEN_TAGS:
+            self.hidden_depth += 1
+            return
+        if tag in BLOCK_TAGS:
+            self._separate()
+        if self.truncated or self.hidden_depth or tag not in EXCERPT_TAGS:
+            return
+        if tag == 'a':
+            href = dict(attrs).get('href') or ''
+            attrs = [('href', href)] if SAFE_URL.match(href) else []
+        else:
+            attrs = []
+        self.excerpt.append(f'<{tag}{_format_attrs(attrs)}>')
+        self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._separate()
+
+    def handle_endtag(self, tag):
+        if tag in HIDDEN_TAGS:
+            self.hidden_depth = max(0, self.hidden_depth - 1)
+            return
+        if tag in BLOCK_TAGS:
+            self._separate()
+        if self.truncated or tag not in self.stack:
+            return
+        while self.stack:
+            open_tag = self.stack.pop()
+            self.excerpt.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.hidden_depth:
+            return
+        self.text.append(data)
+        if self.truncated:
+            return
+
+        # Collapse runs of whitespace the way a browser would when rendering
+        data = WHITESPACE.sub(' ', data)
+        if self.at_space or not self.visible_length:
+            data = data.lstrip(' ')
+        if not data:
+            return
+
+        remaining = max(0, self.limit - self.visible_length)
+        if len(data) > remaining:
+            # Cut at the last word boundary that fits, never mid-word when avoidable
+            cut = data[:remaining]
+            if not data[remaining].isspace() and ' ' in cut:
+                cut = cut[:cut.rindex(' ')]
+            self.excerpt.append(escape(cut.rstrip(), quote=False) + '...')
+            self.truncated = True
+            return
+
+        self.excerpt.append(escape(data, quote=False))
+        self.visible_length += len(data)
+        self.at_space = data.endswith(' ')
+
+    def close(self):
+        super().close()
+        while self.stack:
+            self.excerpt.append(f'</{self.stack.pop()}>')
+        return ''.join(self.excerpt).strip(), ''.join(self.text)
+
+
+def render_content(content):
+    """Return the post body as tag-balanced HTML ready to be emitted with |safe"""
+    parser = _BalancingParser()
+    parser.feed(content or '')
+    return parser.close()
+
+
+def summarize_content(content, excerpt_length=EXCERPT_LENGTH):
+    """Compute every derived field stored alongside a post body.
+
+    Returns a dict with ``excerpt`` (sanitized, tag-balanced HTML limited to
+    ``excerpt_length`` visible characters), ``rendered_html``, ``plain_text``
+    (the visible text, which the search index copies), ``word_count`` and
+    ``reading_time`` (whole minutes, at least one).
+    """
+    parser = _ExcerptParser(excerpt_length)
+    parser.feed(content or '')
+    excerpt, text = parser.close()
+    word_count = len(text.split())
+
+    return {
+        'excerpt': excerpt,
+        'rendered_html': render_content(content),
+        'plain_text': WHITESPACE.sub(' ', text).strip(),
+        'word_count': word_count,
+        'reading_time': max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+    }
@@ -0,0 +1,96 @@
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+# 'auto' picks a profile from the database URL; 'legacy' keeps the old
+# one-size-fits-all options (pre-ping on every checkout, 5 minute recycle)
+PROFILES = ('auto', 'sqlite', 'postgresql', 'mysql', 'legacy')
+
+LEGACY_OPTIONS = {
+    'pool_recycle': 300,
+    'pool_pre_ping': True,
+}
+
+
+def _int(env, name, default):
+    return int(env.get(name, default))
+
+
+def resolve_profile(uri, profile='auto'):
+    """Return the concrete profile for a database URL"""
+    if profile not in PROFILES:
+        raise ValueError(f'Unknown DATABASE_PROFILE {profile!r}; expected one of {", ".join(PROFILES)}')
+    backend = make_url(uri).get_backend_name()
+    if profile == 'auto':
+        return backend if backend in ('sqlite', 'postgresql', 'mysql') else 'legacy'
+    if profile != 'legacy' and profile != backend:
+        raise ValueError(f'DATABASE_PROFILE {profile!r} does not match a {backend} database URL')
+    return profile
+
+
+def sqlite_pragmas(env=os.environ):
+    """PRAGMAs run on every new SQLite connection, in order"""
+    return (
+        # WAL lets readers proceed while a writer commits; NORMAL is durable in WAL mode
+        ('journal_mode', env.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('synchronous', env.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('busy_timeout', _int(env, 'SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        ('mmap_size', _int(env, 'SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        # Negative values are KiB rather than pages
+        ('cache_size', -_int(env, 'SQLITE_CACHE_SIZE_KB', 64 * 1024)),
+    )
+
+
+def engine_options(uri, profile='auto', env=os.environ):
+    """SQLAlchemy ``create_engine`` options for a database URL and profile"""
+    profile = resolve_profile(uri, profile)
+    if profile == 'legacy':
+        return dict(LEGACY_OPTIONS)
+    if profile == 'sqlite':
+        # Local file: connections never go stale, so no pre-ping or recycling
+        return {}
+
+    options = {
+        'pool_size': _int(env, 'DB_POOL_SIZE', 5),
+        'max_overflow': _int(env, 'DB_MAX_OVERFLOW', 10),
+        'pool_timeout': _int(env, 'DB_POOL_TIMEOUT', 30),
+        # MySQL hosts commonly drop idle connections after a few minutes
+        'pool_recycle': _int(env, 'DB_POOL_RECYCLE', 280 if profile == 'mysql' else 1800),
+        'pool_pre_ping': env.get('DB_POOL_PRE_PING', '0') == '1',
+        'pool_use_lifo': True,
+    }
+    timeout_ms = _int(env, 'DB_STATEMENT_TIMEOUT_MS', 30000)
+    if timeout_ms:
+        if profile == 'postgresql':
+            options['connect_args'] = {'options': f'-c statement_timeout={timeout_ms}'}
+        else:
+            # Applies to SELECTs, which is all a runaway public query can be
+            options['connect_args'] = {'init_command': f'SET SESSION max_execution_time={timeout_ms}'}
+    return options
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Run ``pragmas`` on every connection the engine opens"""
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas]
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    return apply_pragmas
+
+
+def init_engine_profiles(app, db):
+    """Attach per-connection setup to the app's engines; call after ``db.init_app``"""
+    profile = app.config.get('DATABASE_PROFILE', 'auto')
+    pragmas = sqlite_pragmas()
+    with app.app_context():
+        for engine in db.engines.values():
+            if resolve_profile(engine.url, profile) == 'sqlite':
+                install_sqlite_pragmas(engine, pragmas)
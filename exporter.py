@@ -0,0 +1,67 @@
+import json
+import zlib
+
+
+WRITE_CHUNK_SIZE = 64 * 1024
+
+
+def _post_dict(row):
+    return {
+        'title': row.title,
+        'content': row.content,
+        'featured_image': row.featured_image,
+        'created_at': row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+def iter_json_export(rows, total_posts, export_date):
+    """Yield a JSON export one post at a time.
+
+    The output is byte-for-byte what ``json.dumps(data, indent=2,
+    ensure_ascii=False)`` produces for the whole export, without ever building
+    that document in memory.
+    """
+    header = json.dumps({'export_date': export_date, 'total_posts': total_posts},
+                        indent=2, ensure_ascii=False)
+    # Reopen the header object so the posts array can be appended to it
+    yield header[:-2] + ',\n  "posts": ['
+
+    first = True
+    for row in rows:
+        post_json = json.dumps(_post_dict(row), indent=2, ensure_ascii=False)
+        yield ('\n' if first else ',\n') + '\n'.join('    ' + line for line in post_json.split('\n'))
+        first = False
+
+    yield ']\n}' if first else '\n  ]\n}'
+
+
+def iter_ndjson_export(rows):
+    """Yield one compact JSON object per line, one line per post"""
+    for row in rows:
+        yield json.dumps(_post_dict(row), ensure_ascii=False) + '\n'
+
+
+def buffered(chunks, size=WRITE_CHUNK_SIZE):
+    """Encode text chunks to UTF-8 and regroup them into writes of roughly ``size`` bytes"""
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        pending.append(data)
+        pending_size += len(data)
+        if pending_size >= size:
+            yield b''.join(pending)
+            pending = []
+            pending_size = 0
+    if pending:
+        yield b''.join(pending)
+
+
+def gzip_stream(chunks, level=6):
+    """Compress a stream of byte chunks into a single gzip member on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
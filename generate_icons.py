@@ -1,44 +1,54 @@
-
-from PIL import Image, ImageDraw, ImageFont
+import argparse
+import io
 import os
+import re
+from PIL import Image, ImageDraw
+from jobs import LazyThreadPool
+from stylesheets import hex_to_rgb
+
+DEFAULT_COLORS = ('#667eea', '#764ba2')
+
+# Regular icon sizes, including the favicons and apple-touch icons base.html links
+ICON_SIZES = [16, 32, 72, 96, 128, 144, 152, 192, 384, 512]
+MASKABLE_SIZES = [192, 512]
+
+HEX_COLOR = re.compile(r'^#?([0-9a-fA-F]{6})$')
+
+# PNG encoding threads shared by every render in the process
+ENCODE_POOL = LazyThreadPool('blog-icons', max_workers=4)
+
+
+def normalize_colors(color1, color2):
+    """Lower-case #rrggbb colours, falling back to the defaults for anything else"""
+    match1, match2 = HEX_COLOR.match(color1 or ''), HEX_COLOR.match(color2 or '')
+    if not (match1 and match2):
+        return DEFAULT_COLORS
+    return f'#{match1.group(1).lower()}', f'#{match2.group(1).lower()}'
 
 def create_gradient_background(size, color1='#667eea', color2='#764ba2'):
-    """Create a gradient background"""
-    img = Image.new('RGBA', size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Convert hex to RGB
-    def hex_to_rgb(hex_color):
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-    
-    rgb1 = hex_to_rgb(color1)
-    rgb2 = hex_to_rgb(color2)
-    
-    # Create gradient
-    for y in range(size[1]):
-        ratio = y / size[1]
-        r = int(rgb1[0] * (1 - ratio) + rgb2[0] * ratio)
-        g = int(rgb1[1] * (1 - ratio) + rgb2[1] * ratio)
-        b = int(rgb1[2] * (1 - ratio) + rgb2[2] * ratio)
-        draw.line([(0, y), (size[0], y)], fill=(r, g, b, 255))
-    
-    return img
+    """Create a vertical gradient background"""
+    # Blend a one-pixel column through Pillow's 0-255 ramp, then stretch it sideways,
+    # instead of one draw call per row
+    width, height = size
+    mask = Image.linear_gradient('L').resize((1, height), Image.BILINEAR)
+    top = Image.new('RGBA', (1, height), hex_to_rgb(color1) + (255,))
+    bottom = Image.new('RGBA', (1, height), hex_to_rgb(color2) + (255,))
+    return Image.composite(bottom, top, mask).resize((width, height), Image.NEAREST)
 
-def create_icon(size):
+def create_icon(size, color1='#667eea', color2='#764ba2'):
     """Create an icon with the blog logo"""
-    img = create_gradient_background((size, size))
+    img = create_gradient_background((size, size), color1, color2)
     draw = ImageDraw.Draw(img)
-    
+
     # Draw a simple blog icon (book with pen)
     center = size // 2
-    
+
     # Draw book
     book_width = size // 2.5
     book_height = size // 2
     book_x = center - book_width // 2
     book_y = center - book_height // 2
-    
+
     # Book cover
     draw.rounded_rectangle(
         [book_x, book_y, book_x + book_width, book_y + book_height],
@@ -47,82 +57,108 @@ def create_icon(size):
         outline='#333',
         width=max(1, size // 64)
     )
-    
+
     # Book lines
     line_spacing = book_height // 6
     for i in range(3):
         y = book_y + book_height // 4 + i * line_spacing
         draw.line(
             [book_x + book_width // 6, y, book_x + book_width * 5 // 6, y],
-            fill='#667eea',
+            fill=color1,
             width=max(1, size // 80)
         )
-    
+
     # Draw pen
     pen_length = size // 3
     pen_width = size // 25
     pen_x = center + book_width // 4
     pen_y = center - pen_length // 2
-    
+
     # Pen body
     draw.rounded_rectangle(
         [pen_x, pen_y, pen_x + pen_width, pen_y + pen_length],
         radius=pen_width // 2,
-        fill='#764ba2'
+        fill=color2
     )
-    
+
     # Pen tip
     draw.ellipse(
-        [pen_x - pen_width // 4, pen_y + pen_length - pen_width, 
+        [pen_x - pen_width // 4, pen_y + pen_length - pen_width,
          pen_x + pen_width + pen_width // 4, pen_y + pen_length + pen_width // 2],
         fill='#333'
     )
-    
+
     return img
 
-def create_maskable_icon(size):
-    """Create a maskable icon with safe zone"""
-    # Create larger canvas to ensure safe zone
-    canvas_size = int(size * 1.2)
-    img = create_gradient_background((canvas_size, canvas_size))
-    
-    # Create the icon in the center
-    icon = create_icon(size)
-    
-    # Paste icon in center of canvas
-    offset = (canvas_size - size) // 2
-    img.paste(icon, (offset, offset), icon)
-    
-    # Resize back to original size
-    img = img.resize((size, size), Image.LANCZOS)
-    
+def create_maskable_icon(icon, color1='#667eea', color2='#764ba2'):
+    """Create a maskable icon with safe zone from an already drawn icon"""
+    # The icon shrunk to 1/1.2 on a full-size gradient keeps the logo inside the safe zone
+    size = icon.width
+    inner = int(size / 1.2)
+    img = create_gradient_background((size, size), color1, color2)
+    offset = (size - inner) // 2
+    img.paste(icon.resize((inner, inner), Image.LANCZOS), (offset, offset))
     return img
 
-def generate_all_icons():
-    """Generate all required PWA icons"""
-    # Create icons directory
-    icons_dir = 'static/icons'
+def downsample(master, sizes):
+    """{size: image}, each size resampled from the next larger one rather than the master"""
+    images, current = {}, master
+    for size in sorted(sizes, reverse=True):
+        if current.width != size:
+            current = current.resize((size, size), Image.LANCZOS)
+        images[size] = current
+    return images
+
+def _png(img):
+    out = io.BytesIO()
+    img.save(out, 'PNG')
+    return out.getvalue()
+
+def render_icons(color1='#667eea', color2='#764ba2', pool=ENCODE_POOL):
+    """Return {filename: PNG bytes} for every regular and maskable icon.
+
+    The artwork is drawn once at the largest size and downsampled for the
+    others; PNG encoding releases the GIL, so the files are encoded in
+    parallel on ``pool``.
+    """
+    # Icons are opaque, so RGB keeps resampling and the PNGs cheaper
+    master = create_icon(max(ICON_SIZES), color1, color2).convert('RGB')
+    maskable = create_maskable_icon(master, color1, color2).convert('RGB')
+    images = {f'icon-{size}x{size}.png': img for size, img in downsample(master, ICON_SIZES).items()}
+    images.update({f'maskable-icon-{size}x{size}.png': img
+                   for size, img in downsample(maskable, MASKABLE_SIZES).items()})
+    futures = {filename: pool.submit(_png, img) for filename, img in images.items()}
+    return {filename: future.result() for filename, future in futures.items()}
+
+def generate_all_icons(icons_dir='icons', color1='#667eea', color2='#764ba2'):
+    """Write every PWA icon to a folder, e.g. for app store listings (the site serves its own from /icons/)"""
     os.makedirs(icons_dir, exist_ok=True)
-    
-    # Regular icon sizes
-    sizes = [72, 96, 128, 144, 152, 192, 384, 512]
-    
-    print("Generating regular icons...")
-    for size in sizes:
-        icon = create_icon(size)
-        icon.save(f'{icons_dir}/icon-{size}x{size}.png', 'PNG')
-        print(f"Created icon-{size}x{size}.png")
-    
-    # Maskable icons
-    maskable_sizes = [192, 512]
-    
-    print("Generating maskable icons...")
-    for size in maskable_sizes:
-        maskable_icon = create_maskable_icon(size)
-        maskable_icon.save(f'{icons_dir}/maskable-icon-{size}x{size}.png', 'PNG')
-        print(f"Created maskable-icon-{size}x{size}.png")
-    
+
+    print(f"Generating icons for {color1} / {color2}...")
+    for filename, data in render_icons(color1, color2).items():
+        with open(os.path.join(icons_dir, filename), 'wb') as f:
+            f.write(data)
+        print(f"Created {filename}")
+
     print("All icons generated successfully!")
 
+
+def current_theme_colors():
+    """The primary and secondary colours saved in SiteSettings"""
+    from app import app, get_site_settings
+    with app.app_context():
+        settings = get_site_settings()
+        return settings.primary_color, settings.secondary_color
+
 if __name__ == "__main__":
-    generate_all_icons()
+    parser = argparse.ArgumentParser(description='Write the PWA icons to a folder.')
+    parser.add_argument('--primary', help='Top gradient colour (default: the site settings)')
+    parser.add_argument('--secondary', help='Bottom gradient colour (default: the site settings)')
+    parser.add_argument('--output', default='icons')
+    args = parser.parse_args()
+
+    if args.primary and args.secondary:
+        colors = (args.primary, args.secondary)
+    else:
+        colors = current_theme_colors()
+    generate_all_icons(args.output, *normalize_colors(*colors))
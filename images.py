@@ -0,0 +1,197 @@
+import io
+import math
+import os
+import threading
+from flask import Response, abort, request, send_file, url_for
+from itsdangerous import BadSignature, URLSafeSerializer
+from werkzeug.security import safe_join
+from artifact_cache import ArtifactCache
+from precompiled import IMMUTABLE_CACHE_CONTROL
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # without Pillow, templates link the original images
+    Image = None
+
+
+# Maximum width in pixels of each variant; the card and hero images are
+# shown 250/300px tall, so these cover the column width at 1x and 2x
+VARIANTS = {
+    'thumb': 400,
+    'card': 800,
+    'hero': 1600,
+}
+
+# URL extension -> (Pillow format, mimetype, save options)
+FORMATS = {
+    'avif': ('AVIF', 'image/avif', {'quality': 55}),
+    'webp': ('WEBP', 'image/webp', {'quality': 78, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# EXIF orientations that swap width and height
+_ROTATED = (5, 6, 7, 8)
+
+
+class ImageService:
+    """Resized, re-encoded copies of featured images, served with immutable caching.
+
+    Only images stored by the site itself (under a local root such as
+    /static/ or /uploads/) are resized, so a request never waits on another
+    server; any other source, e.g. an external or relative URL, is linked
+    unchanged. Image URLs carry a signed token naming the source path, and
+    every variant is encoded once on first request into a size-capped,
+    LRU-evicted disk cache shared by all workers.
+    """
+
+    SALT = 'image'
+
+    def __init__(self, app=None):
+        self.app = None
+        self.serializer = None
+        self.cache = ArtifactCache(name='image')
+        self.local_roots = {}
+        self.formats = ('jpg',)
+        self._locks = [threading.Lock() for _ in range(32)]
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.serializer = URLSafeSerializer(app.config['SECRET_KEY'], salt=self.SALT)
+        self.cache.init_app(app)
+        self.max_source_bytes = app.config.get('IMAGE_MAX_SOURCE_BYTES', 20 * 1024 * 1024)
+        self.max_pixels = app.config.get('IMAGE_MAX_PIXELS', 50_000_000)
+        self.add_local_root(app.static_url_path, app.static_folder)
+
+        if Image is not None:
+            Image.init()
+            # Preferred first; JPEG is the fallback every browser decodes
+            self.formats = tuple(ext for ext, (name, _, _) in FORMATS.items() if name in Image.SAVE)
+
+        app.add_template_global(self.image_url)
+        app.add_template_global(self.image_srcset)
+        app.add_template_global(self.image_formats)
+        app.extensions['images'] = self
+
+    @property
+    def enabled(self):
+        return Image is not None
+
+    def add_local_root(self, url_prefix, root):
+        """Read sources whose URL starts with ``url_prefix`` from disk.
+
+        ``root`` is a directory, or a callable mapping the rest of the URL to
+        a file path (or None).
+        """
+        self.local_roots[url_prefix.rstrip('/') + '/'] = root
+
+    def resizable(self, source):
+        """Whether ``source`` is an image the site stores itself"""
+        return self.enabled and any(source.startswith(prefix) for prefix in self.local_roots)
+
+    # Template helpers
+
+    def image_formats(self, source):
+        """Modern formats to offer in <source> elements, best first"""
+        if not self.resizable(source):
+            return []
+        return [fmt for fmt in self.formats if fmt != 'jpg']
+
+    def image_url(self, source, variant='card', fmt='jpg'):
+        """URL of a resized variant, or ``source`` itself for images stored elsewhere"""
+        if not self.resizable(source):
+            return source
+        return url_for('image_variant', token=self.serializer.dumps(source), variant=variant, fmt=fmt)
+
+    def image_srcset(self, source, fmt='jpg'):
+        if not self.resizable(source):
+            return ''
+        token = self.serializer.dumps(source)
+        return ', '.join(f'{url_for("image_variant", token=token, variant=variant, fmt=fmt)} {width}w'
+                         for variant, width in VARIANTS.items())
+
+    # Serving
+
+    def send(self, token, variant, fmt):
+        if not self.enabled or variant not in VARIANTS or fmt not in self.formats:
+            abort(404)
+        try:
+            source = self.serializer.loads(token)
+        except BadSignature:
+            abort(404)
+
+        key = self.cache.make_key('variant', source, VARIANTS[variant], FORMATS[fmt])
+        body, path = self.cache.get(key)
+        if body is None and path is None:
+            with self._locks[int(key[:8], 16) % len(self._locks)]:
+                # Another request may have encoded it while this one waited
+                body, path = self.cache.get(key)
+                if body is None and path is None:
+                    body = self._encode(source, VARIANTS[variant], fmt)
+                    if body is None:
+                        abort(404)
+                    self.cache.put(key, body)
+
+        mimetype = FORMATS[fmt][1]
+        if path is not None:
+            response = send_file(path, mimetype=mimetype, etag=key, conditional=True)
+        else:
+            response = Response(body, mimetype=mimetype)
+            response.set_etag(key)
+            response.make_conditional(request)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    def _read_source(self, source):
+        for prefix, root in self.local_roots.items():
+            if source.startswith(prefix):
+                relative = source[len(prefix):].split('?')[0]
+                path = root(relative) if callable(root) else safe_join(root, relative)
+                if path is None or not os.path.isfile(path):
+                    return None
+                with open(path, 'rb') as f:
+                    data = f.read(self.max_source_bytes + 1)
+                return data if len(data) <= self.max_source_bytes else None
+        return None
+
+    def _encode(self, source, width, fmt):
+        data = self._read_source(source)
+        if data is None:
+            return None
+        try:
+            return resize_image(data, width, fmt, self.max_pixels)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return None
+
+
+def resize_image(data, width, fmt, max_pixels):
+    """Scale image bytes down to ``width`` and encode them as ``fmt``, dropping all metadata"""
+    pillow_format, _, options = FORMATS[fmt]
+    with Image.open(io.BytesIO(data)) as img:
+        if img.width * img.height > max_pixels:
+            raise ValueError('image too large')
+
+        # Let JPEG decode at a reduced scale that still covers the target size
+        across = img.height if img.getexif().get(0x0112, 1) in _ROTATED else img.width
+        if across > width:
+            scale = width / across
+            img.draft('RGB', (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+
+        img = ImageOps.exif_transpose(img)
+        if img.width > width:
+            img = img.resize((width, max(1, round(img.height * width / img.width))), Image.LANCZOS)
+
+        has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+        if has_alpha and fmt != 'jpg':
+            img = img.convert('RGBA')
+        elif has_alpha:
+            flat = Image.new('RGB', img.size, (255, 255, 255))
+            flat.paste(img.convert('RGBA'), mask=img.convert('RGBA'))
+            img = flat
+        else:
+            img = img.convert('RGB')
+
+        out = io.BytesIO()
+        img.save(out, pillow_format, **options)
+        return out.getvalue()
@@ -0,0 +1,301 @@
+import codecs
+import gzip
+import json
+from datetime import datetime
+from sqlalchemy import func, insert, select
+from content import summarize_content
+
+
+READ_CHUNK_SIZE = 64 * 1024
+# Largest single entry (one post object or NDJSON line) the importer will buffer
+MAX_ENTRY_SIZE = 8 * 1024 * 1024
+WHITESPACE = ' \t\n\r'
+
+# Upload names accepted by the importer, matching what the exporter produces
+IMPORT_EXTENSIONS = ('.json', '.ndjson', '.jsonl', '.json.gz', '.ndjson.gz', '.jsonl.gz')
+
+
+class ImportFormatError(ValueError):
+    """Raised when the uploaded file is not a tutorials export"""
+
+
+class _StreamBuffer:
+    """Incrementally decoded text buffer over a binary stream"""
+
+    def __init__(self, stream, chunk_size, max_value_size=MAX_ENTRY_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.max_value_size = max_value_size
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Read one more chunk, returning False once the stream is exhausted"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            self.text = self.text[self.pos:] + self.decoder.decode(b'', final=True)
+        else:
+            # Drop what has already been consumed so memory stays bounded
+            self.text = self.text[self.pos:] + self.decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                raise ImportFormatError('Unexpected end of file.')
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ImportFormatError(f'Expected "{char}" in JSON file.')
+        self.pos += 1
+
+    def decode_value(self, decoder=json.JSONDecoder()):
+        """Decode one complete JSON value, reading more input until it is whole"""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                self.check_size()
+                if not self.fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end < len(self.text) or self.eof:
+                self.pos = end
+                return value
+            self.check_size()
+            self.fill()
+
+    def check_size(self):
+        """Reject the file once the value being decoded outgrows ``max_value_size``"""
+        if len(self.text) - self.pos > self.max_value_size:
+            raise ImportFormatError(
+                f'An entry is larger than {self.max_value_size // (1024 * 1024)} MB.'
+            )
+
+
+def iter_json_posts(stream, chunk_size=READ_CHUNK_SIZE, max_entry_size=MAX_ENTRY_SIZE):
+    """Yield the entries of the top-level "posts" array of an export without loading the file.
+
+    Only one post object is held in memory at a time; other top-level keys
+    (export_date, total_posts, ...) are read and discarded. A single value
+    larger than ``max_entry_size`` characters rejects the whole file.
+    """
+    buffer = _StreamBuffer(stream, chunk_size, max_entry_size)
+    buffer.expect('{')
+    found_posts = False
+
+    if buffer.peek() == '}':
+        raise ImportFormatError('Invalid file format! Missing posts data.')
+
+    while True:
+        key = buffer.decode_value()
+        buffer.expect(':')
+
+        if key == 'posts':
+            found_posts = True
+            buffer.expect('[')
+            if buffer.peek() == ']':
+                buffer.pos += 1
+            else:
+                while True:
+                    yield buffer.decode_value()
+                    if buffer.peek() == ',':
+                        buffer.pos += 1
+                        continue
+                    buffer.expect(']')
+                    break
+        else:
+            buffer.decode_value()
+
+        if buffer.peek() == ',':
+            buffer.pos += 1
+            continue
+        buffer.expect('}')
+        break
+
+    if not found_posts:
+        raise ImportFormatError('Invalid file format! Missing posts data.')
+
+
+class RejectedEntry:
+    """Placeholder yielded for an entry that could not be decoded at all"""
+
+    __slots__ = ('reason',)
+
+    def __init__(self, reason):
+        self.reason = reason
+
+
+def iter_ndjson_posts(stream, max_entry_size=MAX_ENTRY_SIZE):
+    """Yield one post per non-blank line of a newline-delimited JSON upload"""
+    while True:
+        line = stream.readline(max_entry_size + 1)
+        if not line:
+            break
+        if len(line) > max_entry_size and not line.endswith(b'\n'):
+            raise ImportFormatError(
+                f'An entry is larger than {max_entry_size // (1024 * 1024)} MB.'
+            )
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            yield RejectedEntry(f'Invalid JSON: {e}')
+
+
+def iter_upload_posts(filename, stream):
+    """Pick the streaming parser for an upload from its file name"""
+    name = filename.lower()
+    if name.endswith('.gz'):
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+        name = name[:-3]
+    if name.endswith(('.ndjson', '.jsonl')):
+        return iter_ndjson_posts(stream)
+    return iter_json_posts(stream)
+
+
+class ImportReport:
+    """Running totals for an import, updated after every batch"""
+
+    MAX_REJECTIONS = 500
+
+    def __init__(self):
+        self.processed = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.rejections = []
+
+    @property
+    def skipped(self):
+        return self.duplicates + self.rejected
+
+    def reject(self, index, title, reason):
+        self.rejected += 1
+        # Keep the report bounded even for files full of bad rows
+        if len(self.rejections) < self.MAX_REJECTIONS:
+            self.rejections.append({'index': index, 'title': title, 'reason': reason})
+
+    def to_dict(self):
+        return {
+            'processed': self.processed,
+            'imported': self.imported,
+            'duplicates': self.duplicates,
+            'rejected': self.rejected,
+            'rejections': self.rejections,
+        }
+
+
+def _parse_created_at(value):
+    if not value:
+        return datetime.utcnow()
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError, AttributeError):
+        return datetime.utcnow()
+
+
+def _post_row(post_data):
+    row = {
+        'title': post_data['title'],
+        'content': post_data['content'],
+        'featured_image': post_data.get('featured_image'),
+        'created_at': _parse_created_at(post_data.get('created_at')),
+    }
+    row.update(summarize_content(row['content']))
+    return row
+
+
+def import_posts(session, model, posts, batch_size=500, on_progress=None):
+    """Insert posts in bounded batches, skipping duplicates by title.
+
+    Titles are compared case-insensitively, both within the file and against
+    the database, so the result does not depend on the column collation.
+    Each batch costs one ``SELECT ... WHERE title IN (...)`` for the duplicate
+    check and one multi-row INSERT, and is committed on its own so a large
+    import never holds one long transaction. ``on_progress(report)`` is called
+    after every batch and may raise to abort the import between batches.
+    """
+    report = ImportReport()
+    seen_titles = set()
+    pending = []
+
+    def flush():
+        titles = {row['title'] for row in pending}
+        lowered = {title.lower() for title in titles}
+        existing = {title.casefold() for title in session.execute(
+            select(model.title).where(
+                model.title.in_(titles) | func.lower(model.title).in_(lowered)
+            )
+        ).scalars()}
+
+        rows = []
+        for row in pending:
+            if row['title'].casefold() in existing:
+                report.duplicates += 1
+            else:
+                rows.append(row)
+
+        if rows:
+            session.execute(insert(model), rows)
+        session.commit()
+        report.imported += len(rows)
+        pending.clear()
+
+        if on_progress:
+            on_progress(report)
+
+    for index, post_data in enumerate(posts):
+        report.processed += 1
+
+        if isinstance(post_data, RejectedEntry):
+            report.reject(index, None, post_data.reason)
+            continue
+
+        if not isinstance(post_data, dict):
+            report.reject(index, None, 'Entry is not an object')
+            continue
+
+        title = post_data.get('title')
+        if not title or not post_data.get('content'):
+            report.reject(index, title, 'Missing title or content')
+            continue
+        if not isinstance(title, str) or not isinstance(post_data['content'], str):
+            report.reject(index, str(title), 'Title and content must be text')
+            continue
+        if len(title) > model.title.type.length:
+            report.reject(index, title, f'Title longer than {model.title.type.length} characters')
+            continue
+
+        # Duplicates inside the same file never reach the database
+        key = title.casefold()
+        if key in seen_titles:
+            report.duplicates += 1
+            continue
+        seen_titles.add(key)
+
+        pending.append(_post_row(post_data))
+        if len(pending) >= batch_size:
+            flush()
+
+    if pending:
+        flush()
+    elif on_progress:
+        on_progress(report)
+
+    return report
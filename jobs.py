@@ -0,0 +1,274 @@
+import json
+import os
+import secrets
+import shutil
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+def _boot_id():
+    """Identifier of the current host boot, so pids from before a reboot are never trusted"""
+    try:
+        with open('/proc/sys/kernel/random/boot_id') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+HOST = socket.gethostname()
+BOOT_ID = _boot_id()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when an admin asked for it to stop"""
+
+
+class LazyThreadPool:
+    """A thread pool created on first use, so importing the app never starts threads"""
+
+    def __init__(self, thread_name_prefix, max_workers=2):
+        self.thread_name_prefix = thread_name_prefix
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix=self.thread_name_prefix)
+        return self._executor.submit(fn, *args, **kwargs)
+
+
+class JobContext:
+    """Handle passed to a running job for progress reporting and artifacts"""
+
+    def __init__(self, runner, job_id, params, directory):
+        self.runner = runner
+        self.job_id = job_id
+        self.params = params
+        self.directory = directory
+
+    def path(self, filename):
+        """Absolute path for a file inside this job's artifact directory"""
+        return os.path.join(self.directory, filename)
+
+    def report_progress(self, **progress):
+        """Persist progress and stop the job if cancellation was requested"""
+        job = self.runner._get(self.job_id)
+        job.progress = json.dumps(progress)
+        job.heartbeat_at = datetime.utcnow()
+        self.runner.db.session.commit()
+        if job.cancel_requested:
+            raise JobCancelled()
+
+    def check_cancelled(self):
+        job = self.runner._get(self.job_id)
+        if job.cancel_requested:
+            raise JobCancelled()
+
+
+class JobRunner:
+    """In-process background jobs backed by a table in the application database.
+
+    Jobs run on a small thread pool inside the worker that enqueued them; their
+    state lives in the database so any worker can report on or cancel them.
+    Artifacts (uploaded inputs, generated exports) live on local disk under
+    ``JOB_ARTIFACT_DIR``. There is no external broker, so this is meant for a
+    single host.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.db = None
+        self.model = None
+        self.directory = None
+        self.handlers = {}
+        self.pool = LazyThreadPool('blog-job')
+        self.token = secrets.token_hex(4)
+        # Ids of queued jobs created by this process that its pool has not started yet
+        self._pending = set()
+
+    @property
+    def owner(self):
+        """Identity of this process, recorded on the jobs it creates (computed per pid for forks)"""
+        return f'{HOST}:{BOOT_ID}:{os.getpid()}:{self.token}'
+
+    def init_app(self, app, db, model):
+        self.app = app
+        self.db = db
+        self.model = model
+        self.directory = app.config.get('JOB_ARTIFACT_DIR') or os.path.join(app.instance_path, 'jobs')
+        self.pool.max_workers = app.config.get('JOB_WORKERS', 2)
+        app.extensions['jobs'] = self
+
+    def handler(self, kind):
+        """Register ``func(context)`` as the implementation of a job kind"""
+        def decorator(func):
+            self.handlers[kind] = func
+            return func
+        return decorator
+
+    def job_directory(self, job_id):
+        return os.path.join(self.directory, str(job_id))
+
+    def _get(self, job_id):
+        job = self.db.session.get(self.model, job_id)
+        self.db.session.refresh(job)
+        return job
+
+    def create(self, kind, params=None):
+        """Record a queued job and create its artifact directory, without starting it"""
+        if kind not in self.handlers:
+            raise ValueError(f'Unknown job kind: {kind}')
+        job = self.model(kind=kind, status=QUEUED, params=json.dumps(params or {}), owner=self.owner)
+        self.db.session.add(job)
+        self.db.session.commit()
+        self._pending.add(job.id)
+        os.makedirs(self.job_directory(job.id), exist_ok=True)
+        return job
+
+    def start(self, job):
+        """Hand a created job to the thread pool"""
+        self.pool.submit(self._run, job.id)
+        return job
+
+    def submit(self, kind, params=None):
+        """Queue a job and return immediately"""
+        return self.start(self.create(kind, params))
+
+    def cancel(self, job):
+        """Ask a job to stop; queued jobs are cancelled straight away"""
+        if job.status in FINISHED_STATES:
+            return False
+        job.cancel_requested = True
+        if job.status == QUEUED:
+            job.status = CANCELLED
+            job.finished_at = datetime.utcnow()
+        self.db.session.commit()
+        return True
+
+    def delete(self, job):
+        self._pending.discard(job.id)
+        shutil.rmtree(self.job_directory(job.id), ignore_errors=True)
+        self.db.session.delete(job)
+        self.db.session.commit()
+
+    def mark_stale(self):
+        """Fail jobs lost with their worker (e.g. it was restarted).
+
+        Running jobs are stale once their heartbeat stops for longer than
+        ``JOB_STALE_SECONDS``. Queued jobs have no heartbeat, so they are only
+        failed once the process that owns them is gone; however long they wait
+        in a live pool, they still run.
+        """
+        timeout = timedelta(seconds=self.app.config.get('JOB_STALE_SECONDS', 600))
+        cutoff = datetime.utcnow() - timeout
+        candidates = self.model.query.filter(or_(
+            and_(self.model.status == RUNNING, self.model.heartbeat_at < cutoff),
+            self.model.status == QUEUED,
+        )).all()
+        stale = [job for job in candidates if job.status == RUNNING or self._orphaned(job, cutoff)]
+        for job in stale:
+            if job.status == RUNNING:
+                job.error = 'Job was interrupted (no heartbeat from its worker).'
+            else:
+                job.error = 'Job never started (its worker stopped before running it).'
+            job.status = FAILED
+            job.finished_at = datetime.utcnow()
+        if stale:
+            self.db.session.commit()
+        return len(stale)
+
+    def _orphaned(self, job, cutoff):
+        """Whether a queued job's owning process can no longer run it"""
+        if not job.owner:
+            # Queued before owners were recorded
+            return job.created_at < cutoff
+        if job.owner == self.owner:
+            return job.id not in self._pending
+        host, boot_id, pid, _ = job.owner.rsplit(':', 3)
+        if host != HOST:
+            # Other hosts' processes cannot be checked from here
+            return False
+        if boot_id != BOOT_ID or int(pid) == os.getpid():
+            # The host rebooted, or this pid belonged to an earlier process
+            return True
+        return not _pid_alive(int(pid))
+
+    def _run(self, job_id):
+        self._pending.discard(job_id)
+        with self.app.app_context():
+            job = self._get(job_id)
+            if job.status != QUEUED:
+                return
+
+            job.status = RUNNING
+            job.started_at = job.heartbeat_at = datetime.utcnow()
+            self.db.session.commit()
+
+            context = JobContext(self, job_id, json.loads(job.params or '{}'), self.job_directory(job_id))
+            try:
+                result = self.handlers[job.kind](context)
+            except JobCancelled:
+                self.db.session.rollback()
+                self._finish(job_id, CANCELLED)
+            except Exception as e:
+                self.db.session.rollback()
+                self.app.logger.error('Job %s (%s) failed:\n%s', job_id, job.kind, traceback.format_exc())
+                self._finish(job_id, FAILED, error=str(e))
+            else:
+                self._finish(job_id, SUCCEEDED, result=result)
+            finally:
+                self.db.session.remove()
+
+    def _finish(self, job_id, status, result=None, error=None):
+        job = self._get(job_id)
+        job.status = status
+        job.finished_at = datetime.utcnow()
+        if result is not None:
+            job.result = json.dumps(result)
+            job.artifact = result.get('artifact') if isinstance(result, dict) else None
+        job.error = error
+        self.db.session.commit()
+
+
+def job_to_dict(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': json.loads(job.progress) if job.progress else None,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+        'has_artifact': bool(job.artifact),
+        'cancel_requested': job.cancel_requested,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+
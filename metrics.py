@@ -0,0 +1,238 @@
+import hmac
+import threading
+import time
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the queries-per-request histogram buckets; high counts point at N+1 loops
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+SLOW_QUERY_LOG_LENGTH = 500
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.total:.6f}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class RequestTimer:
+    """Time spent in one request, split into database, template and context processor work"""
+
+    __slots__ = ('started', 'db', 'queries', 'template', 'template_started', 'context')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db = 0.0
+        self.queries = 0
+        self.template = 0.0
+        self.template_started = None
+        self.context = 0.0
+
+    def server_timing(self, total):
+        return ', '.join((
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f'ctx;dur={self.context * 1000:.1f};desc="context processors"',
+            f'tpl;dur={self.template * 1000:.1f};desc="templates"',
+            f'total;dur={total * 1000:.1f}',
+        ))
+
+
+class RequestMetrics:
+    """Opt-in per-request timings, SQL query counts and a slow-query log.
+
+    With ``METRICS_ENABLED`` every response carries a Server-Timing header
+    (database, context processor, template and total time) and per-endpoint
+    latency and query-count histograms are kept for ``/admin/metrics`` in
+    Prometheus text format. Queries are counted through engine events, so
+    every bind (including read replicas) is covered. Statements slower than
+    ``SLOW_QUERY_MS`` are logged as warnings whether or not metrics are on.
+
+    Counters live in the worker process, so with several workers each
+    scrape sees only the requests the answering worker served.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.slow_query_seconds = None
+        self.token = None
+        self._latency = {}
+        self._queries = {}
+        self._responses = {}
+        self._slow_queries = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        """Call after ``db.init_app``"""
+        self.app = app
+        self.enabled = app.config.get('METRICS_ENABLED', False)
+        slow_query_ms = app.config.get('SLOW_QUERY_MS', 0)
+        self.slow_query_seconds = slow_query_ms / 1000 if slow_query_ms else None
+        self.token = app.config.get('METRICS_TOKEN')
+        app.extensions['metrics'] = self
+
+        if self.enabled or self.slow_query_seconds:
+            with app.app_context():
+                for engine in db.engines.values():
+                    event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                    event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+                    event.listen(engine, 'handle_error', self._handle_error)
+
+        if self.enabled:
+            app.before_request(self._start_request)
+            app.after_request(self._finish_request)
+            before_render_template.connect(self._before_render, app)
+            template_rendered.connect(self._after_render, app)
+            # Context processors run inside render_template before the signals fire
+            update_template_context = app.update_template_context
+
+            def timed_update_template_context(context):
+                timer = g.get('_request_timer') if has_request_context() else None
+                if timer is None:
+                    return update_template_context(context)
+                started = time.perf_counter()
+                try:
+                    return update_template_context(context)
+                finally:
+                    timer.context += time.perf_counter() - started
+
+            app.update_template_context = timed_update_template_context
+
+    def authorized(self, request):
+        """Whether the request carries the scrape token (``Authorization: Bearer <token>``)"""
+        if not self.token:
+            return False
+        supplied = request.headers.get('Authorization', '')
+        return hmac.compare_digest(supplied.encode(), f'Bearer {self.token}'.encode())
+
+    # Request hooks
+
+    def _start_request(self):
+        g._request_timer = RequestTimer()
+
+    def _finish_request(self, response):
+        timer = g.pop('_request_timer', None)
+        if timer is None:
+            return response
+        total = time.perf_counter() - timer.started
+        response.headers['Server-Timing'] = timer.server_timing(total)
+
+        endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            latency = self._latency.get(endpoint)
+            if latency is None:
+                latency = self._latency[endpoint] = Histogram(LATENCY_BUCKETS)
+                self._queries[endpoint] = Histogram(QUERY_COUNT_BUCKETS)
+            latency.observe(total)
+            self._queries[endpoint].observe(timer.queries)
+            key = (endpoint, request.method, response.status_code)
+            self._responses[key] = self._responses.get(key, 0) + 1
+        return response
+
+    def _before_render(self, sender, template, context, **extra):
+        timer = g.get('_request_timer')
+        if timer is not None:
+            timer.template_started = time.perf_counter()
+
+    def _after_render(self, sender, template, context, **extra):
+        timer = g.get('_request_timer')
+        if timer is not None and timer.template_started is not None:
+            timer.template += time.perf_counter() - timer.template_started
+            timer.template_started = None
+
+    # Engine events
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_query_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['_query_started'].pop()
+        elapsed = time.perf_counter() - started
+
+        timer = g.get('_request_timer') if has_request_context() else None
+        if timer is not None:
+            timer.db += elapsed
+            timer.queries += 1
+
+        if self.slow_query_seconds and elapsed >= self.slow_query_seconds:
+            with self._lock:
+                self._slow_queries += 1
+            where = request.endpoint if has_request_context() else 'no request'
+            self.app.logger.warning('Slow query (%.1f ms, %s): %s', elapsed * 1000, where,
+                                    ' '.join(statement.split())[:SLOW_QUERY_LOG_LENGTH])
+
+    def _handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute
+        connection = exception_context.connection
+        if connection is not None and connection.info.get('_query_started'):
+            connection.info['_query_started'].pop()
+
+    # Exposition
+
+    def render_prometheus(self):
+        with self._lock:
+            latency = {endpoint: _copy(histogram) for endpoint, histogram in self._latency.items()}
+            queries = {endpoint: _copy(histogram) for endpoint, histogram in self._queries.items()}
+            responses = dict(self._responses)
+            slow_queries = self._slow_queries
+
+        lines = [
+            '# HELP http_request_duration_seconds Time to build the response, by endpoint.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for endpoint in sorted(latency):
+            lines.extend(latency[endpoint].lines('http_request_duration_seconds', f'endpoint="{endpoint}"'))
+
+        lines += [
+            '# HELP db_queries_per_request SQL statements executed per request, by endpoint.',
+            '# TYPE db_queries_per_request histogram',
+        ]
+        for endpoint in sorted(queries):
+            lines.extend(queries[endpoint].lines('db_queries_per_request', f'endpoint="{endpoint}"'))
+
+        lines += [
+            '# HELP http_responses_total Responses sent, by endpoint, method and status.',
+            '# TYPE http_responses_total counter',
+        ]
+        for (endpoint, method, status), count in sorted(responses.items()):
+            lines.append(f'http_responses_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+        lines += [
+            '# HELP db_slow_queries_total Statements slower than SLOW_QUERY_MS.',
+            '# TYPE db_slow_queries_total counter',
+            f'db_slow_queries_total {slow_queries}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+def _copy(histogram):
+    copy = Histogram(histogram.buckets)
+    copy.counts = list(histogram.counts)
+    copy.total = histogram.total
+    copy.count = histogram.count
+    return copy
@@ -0,0 +1,197 @@
+import time
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import (Column, DateTime, Integer, MetaData, String, Table, bindparam, inspect, literal,
+                        select, text, update)
+
+
+# Bookkeeping lives outside the models' metadata so create_all never touches it
+_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', _metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+class Migration:
+    __slots__ = ('version', 'name', 'func')
+
+    def __init__(self, version, name, func):
+        self.version = version
+        self.name = name
+        self.func = func
+
+
+class MigrationContext:
+    """Handle passed to each migration"""
+
+    def __init__(self, db, echo):
+        self.db = db
+        self.engine = db.engine
+        self.session = db.session
+        self.echo = echo
+
+    def has_column(self, table_name, column_name):
+        return any(column['name'] == column_name for column in inspect(self.engine).get_columns(table_name))
+
+    def add_column(self, column):
+        """ALTER TABLE ... ADD COLUMN for a model column, unless it already exists.
+
+        NOT NULL columns need a scalar default so existing rows can be filled.
+        """
+        table_name = column.table.name
+        if self.has_column(table_name, column.name):
+            return False
+        dialect = self.engine.dialect
+        ddl = f'ALTER TABLE {table_name} ADD COLUMN {column.name} {column.type.compile(dialect=dialect)}'
+        if not column.nullable:
+            if column.default is None or not column.default.is_scalar:
+                raise ValueError(f'{table_name}.{column.name} is NOT NULL but has no scalar default')
+            value = literal(column.default.arg).compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+            ddl += f' NOT NULL DEFAULT {value}'
+        with self.engine.begin() as conn:
+            conn.execute(text(ddl))
+        self.echo(f'  added column {table_name}.{column.name}')
+        return True
+
+    def create_index(self, index):
+        """Create a model index unless an index with that name exists"""
+        existing = {item['name'] for item in inspect(self.engine).get_indexes(index.table.name)}
+        if index.name in existing:
+            return False
+        index.create(self.engine)
+        self.echo(f'  created index {index.name}')
+        return True
+
+
+def batched_backfill(session, table, columns, compute, where=None, batch_size=500, on_batch=None):
+    """Write ``compute(row)`` into every matching row in primary-key order, one transaction per batch.
+
+    Works on core tables, so migrations can pass their frozen definitions:
+    each batch is a keyset ``SELECT id, *columns`` and one executemany
+    ``UPDATE``, committed on its own, so the table stays writable while a
+    backfill runs and an interrupted run can simply be restarted.
+    ``compute(row)`` returns {column name: value}; ``on_batch(updated)`` is
+    called after each commit. Returns the number of rows updated.
+    """
+    updated = 0
+    last_id = 0
+    statement = None
+    while True:
+        query = select(table.c.id, *columns).where(table.c.id > last_id)
+        if where is not None:
+            query = query.where(where)
+        batch = session.execute(query.order_by(table.c.id).limit(batch_size)).all()
+        if not batch:
+            break
+
+        rows = []
+        for row in batch:
+            values = compute(row)
+            if statement is None:
+                statement = update(table).where(table.c.id == bindparam('row_id')).values(
+                    {name: bindparam(f'new_{name}') for name in values}
+                )
+            rows.append({'row_id': row.id, **{f'new_{name}': value for name, value in values.items()}})
+        session.execute(statement, rows)
+        session.commit()
+
+        updated += len(batch)
+        last_id = batch[-1].id
+        if on_batch:
+            on_batch(updated)
+    return updated
+
+
+class MigrationRunner:
+    """Ordered, versioned schema migrations recorded in a schema_migrations table.
+
+    Migrations are plain functions registered with ``@migrations.migration``
+    and run by ``flask db upgrade``. Each one is recorded as soon as it
+    succeeds, and is written to be safe to re-run, so a failed upgrade can be
+    retried and databases created before this runner existed are upgraded in
+    place without losing data.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.db = None
+        self.migrations = {}
+
+    def init_app(self, app, db):
+        self.app = app
+        self.db = db
+        app.cli.add_command(self._cli())
+        app.extensions['migrations'] = self
+
+    def migration(self, version, name):
+        """Register ``func(context)`` as migration number ``version``"""
+        def decorator(func):
+            if version in self.migrations:
+                raise ValueError(f'Duplicate migration version {version}')
+            self.migrations[version] = Migration(version, name, func)
+            return func
+        return decorator
+
+    @property
+    def head(self):
+        return max(self.migrations, default=0)
+
+    def applied(self):
+        """Versions already applied, creating the bookkeeping table if needed"""
+        _metadata.create_all(self.db.engine)
+        with self.db.engine.connect() as conn:
+            return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    def current(self):
+        return max(self.applied(), default=0)
+
+    def pending(self, target=None):
+        applied = self.applied()
+        return [self.migrations[version] for version in sorted(self.migrations)
+                if version not in applied and (target is None or version <= target)]
+
+    def upgrade(self, target=None, echo=click.echo):
+        """Apply pending migrations in order; returns the ones that ran"""
+        pending = self.pending(target)
+        context = MigrationContext(self.db, echo)
+        for migration in pending:
+            echo(f'Applying {migration.version:04d} {migration.name}')
+            started = time.perf_counter()
+            migration.func(context)
+            self.db.session.commit()
+            with self.db.engine.begin() as conn:
+                conn.execute(schema_migrations.insert().values(
+                    version=migration.version, name=migration.name, applied_at=datetime.utcnow(),
+                ))
+            echo(f'  done in {time.perf_counter() - started:.2f}s')
+        return pending
+
+    def _cli(self):
+        group = AppGroup('db', help='Database schema migrations.')
+
+        @group.command('upgrade')
+        @click.option('--target', type=int, help='Stop after this migration version.')
+        def upgrade_command(target):
+            """Apply pending migrations."""
+            applied = self.upgrade(target)
+            click.echo(f'Database is at version {self.current()}'
+                       + ('' if applied else ' (already up to date)') + '.')
+
+        @group.command('current')
+        def current_command():
+            """Show the applied schema version."""
+            click.echo(f'{self.current()} (head is {self.head})')
+
+        @group.command('history')
+        def history_command():
+            """List migrations and whether they are applied."""
+            applied = self.applied()
+            for version in sorted(self.migrations):
+                mark = 'x' if version in applied else ' '
+                click.echo(f'[{mark}] {version:04d} {self.migrations[version].name}')
+
+        return group
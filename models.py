@@ -1,7 +1,28 @@
-from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import DeclarativeBase
+from content import summarize_content
+from replicas import RoutingSession
+
+
+class Base(DeclarativeBase):
+    pass
 
-db = SQLAlchemy()
+
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession})
+
+# Values for a site that has not been customised yet
+DEFAULT_SITE_SETTINGS = {
+    'blog_title': 'Blog CMS',
+    'blog_description': 'Welcome to Our Blog',
+    'primary_color': '#667eea',
+    'secondary_color': '#764ba2',
+    'background_color': '#667eea',
+    'overall_background': '#1a1a2e',
+    'card_background': '#ffffff',
+    'text_color': '#333333',
+    'navbar_color': '#000000',
+}
 
 class Post(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -9,6 +30,26 @@ class Post(db.Model):
     content = db.Column(db.Text, nullable=False)
     featured_image = db.Column(db.String(500), nullable=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Derived from content on every write so read paths never parse the body
+    excerpt = db.Column(db.Text, nullable=True)
+    rendered_html = db.Column(db.Text, nullable=True)
+    plain_text = db.Column(db.Text, nullable=True)
+    word_count = db.Column(db.Integer, nullable=True)
+    reading_time = db.Column(db.Integer, nullable=True)
+
+    __table_args__ = (
+        # Backs the keyset-paginated listings ordered by (created_at, id)
+        db.Index('ix_post_created_at_id', 'created_at', 'id'),
+        # Used by the batched duplicate check on import
+        db.Index('ix_post_title', 'title'),
+    )
+
+    def refresh_derived_fields(self):
+        """Recompute the excerpt, rendered HTML and reading stats from content"""
+        for field, value in summarize_content(self.content).items():
+            setattr(self, field, value)
 
     def __repr__(self):
         return f'<Post {self.id}: {self.title}>'
@@ -22,9 +63,37 @@ class SiteSettings(db.Model):
     primary_color = db.Column(db.String(7), nullable=False, default='#667eea')
     secondary_color = db.Column(db.String(7), nullable=False, default='#764ba2')
     background_color = db.Column(db.String(7), nullable=False, default='#667eea')
+    overall_background = db.Column(db.String(7), nullable=False, default='#1a1a2e')
     card_background = db.Column(db.String(7), nullable=False, default='#ffffff')
     text_color = db.Column(db.String(7), nullable=False, default='#333333')
     navbar_color = db.Column(db.String(7), nullable=False, default='#000000')
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def with_defaults(cls):
+        """An unsaved settings row holding the default values"""
+        return cls(**DEFAULT_SITE_SETTINGS)
+
+class Job(db.Model):
+    """A background admin operation (import, export, backfill) run by the JobRunner"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    params = db.Column(db.Text, nullable=True)
+    progress = db.Column(db.Text, nullable=True)
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    artifact = db.Column(db.String(255), nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    # host:boot id:pid:token of the process whose thread pool holds the job while it is queued
+    owner = db.Column(db.String(255), nullable=True)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<Job {self.id}: {self.kind} {self.status}>'
@@ -0,0 +1,82 @@
+from functools import wraps
+from operator import attrgetter
+from flask import Response, make_response, request, session
+from artifact_cache import MemoryLRU
+
+
+# Headers that are specific to one client and must never be replayed from the cache
+UNCACHED_HEADERS = {'set-cookie', 'content-length', 'date'}
+
+
+class CachedPage:
+    __slots__ = ('body', 'status', 'headers', 'size')
+
+    def __init__(self, body, status, headers):
+        self.body = body
+        self.status = status
+        self.headers = headers
+        self.size = len(body) + sum(len(k) + len(v) for k, v in headers)
+
+
+class PageCache:
+    """Per-process LRU cache of rendered public pages, bounded by total bytes.
+
+    Keys combine the request path with the version counters a page depends on,
+    so a write that bumps a counter makes every stale entry unreachable in every
+    worker at once; unreachable entries simply age out of the LRU. Requests from
+    logged-in admins, or with flashed messages waiting to be shown, always
+    bypass the cache.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.pages = MemoryLRU(0, size=attrgetter('size'))
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PAGE_CACHE_ENABLED', True)
+        self.pages = MemoryLRU(app.config.get('PAGE_CACHE_MAX_BYTES', 32 * 1024 * 1024), size=attrgetter('size'))
+        app.extensions['page_cache'] = self
+
+    @staticmethod
+    def is_cacheable_request():
+        if request.method != 'GET':
+            return False
+        # Admin pages render differently, and pending flashes must reach this user only
+        return not session.get('logged_in') and '_flashes' not in session
+
+    @staticmethod
+    def is_cacheable_response(response):
+        return (response.status_code == 200
+                and not response.is_streamed
+                and 'Set-Cookie' not in response.headers)
+
+    def cached(self, dependencies):
+        """Cache a view's response for anonymous visitors.
+
+        ``dependencies(**view_args)`` returns the version values the page
+        depends on; it must not touch the database, so cache hits never do.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or not self.is_cacheable_request():
+                    return view(*args, **kwargs)
+
+                key = (request.full_path, dependencies(**kwargs))
+                entry = self.pages.get(key)
+                if entry is not None:
+                    response = Response(entry.body, status=entry.status, headers=entry.headers)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                response = make_response(view(*args, **kwargs))
+                if self.is_cacheable_response(response):
+                    headers = [(k, v) for k, v in response.headers.items()
+                               if k.lower() not in UNCACHED_HEADERS]
+                    self.pages.set(key, CachedPage(response.get_data(), response.status_code, headers))
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
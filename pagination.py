@@ -0,0 +1,48 @@
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at, post_id):
+    """Encode a (created_at, id) position as an opaque URL-safe token"""
+    raw = f'{created_at.isoformat()}|{post_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a cursor token, returning (created_at, id) or None if invalid"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        created_at, post_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(query, created_at_col, id_col, cursor=None, per_page=10):
+    """Return one page of rows ordered newest first, plus the cursor for the next page.
+
+    The query is filtered to rows strictly after the cursor position in
+    (created_at DESC, id DESC) order, so every page is a single index range scan
+    regardless of how deep the reader has paged.
+    """
+    position = decode_cursor(cursor)
+    if position:
+        created_at, post_id = position
+        query = query.filter(or_(
+            created_at_col < created_at,
+            and_(created_at_col == created_at, id_col < post_id),
+        ))
+
+    rows = query.order_by(created_at_col.desc(), id_col.desc()).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return rows, next_cursor
@@ -0,0 +1,56 @@
+from bisect import bisect_left
+from collections import namedtuple
+from versions import VersionedMemo
+
+
+PostTitle = namedtuple('PostTitle', ('id', 'title'))
+
+
+class _TitleSnapshot:
+    __slots__ = ('posts', 'keys', 'by_key')
+
+    def __init__(self, posts):
+        self.posts = tuple(PostTitle(*row) for row in posts)
+        # Title-sorted copy for prefix search; keys are casefolded for case-insensitive matching
+        ordered = sorted(self.posts, key=lambda post: (post.title.casefold(), post.id))
+        self.keys = [post.title.casefold() for post in ordered]
+        self.by_key = ordered
+
+
+class PostTitleIndex:
+    """Per-process list of (id, title) for every post, reloaded only when the 'posts' version changes.
+
+    ``loader()`` returns (id, title) rows newest first. The index never holds
+    post content, so it stays small for large catalogues, and a title-sorted
+    copy answers typeahead prefix queries with a binary search.
+    """
+
+    VERSION_KEY = 'posts'
+
+    def __init__(self, versions, loader):
+        self.versions = versions
+        self.loader = loader
+        self._memo = VersionedMemo()
+
+    def _get(self):
+        return self._memo.get(self.versions.get(self.VERSION_KEY), lambda: _TitleSnapshot(self.loader()))
+
+    def all(self):
+        """Every post as a PostTitle, newest first"""
+        return self._get().posts
+
+    def search(self, prefix, limit=10):
+        """Posts whose title starts with ``prefix`` (case-insensitive), in title order"""
+        snapshot = self._get()
+        prefix = prefix.strip().casefold()
+        if not prefix:
+            return []
+
+        results = []
+        index = bisect_left(snapshot.keys, prefix)
+        while index < len(snapshot.keys) and len(results) < limit:
+            if not snapshot.keys[index].startswith(prefix):
+                break
+            results.append(snapshot.by_key[index])
+            index += 1
+        return results
@@ -0,0 +1,73 @@
+import gzip
+import hashlib
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+
+# Content-Encoding -> file suffix of a precompressed copy, in order of preference
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def compress_variants(body):
+    """{encoding: compressed body} for every encoding available here, at maximum compression"""
+    variants = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, quality=11)
+    return variants
+
+
+def pick_encoding(request, available):
+    """The preferred encoding among ``available`` that the client accepts, or None"""
+    for encoding in ENCODING_SUFFIXES:
+        if encoding in available and request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+class PrecompiledResponse:
+    """A response body rendered once and kept with its compressed variants and ETag.
+
+    Serving it is a dictionary lookup: the body is never rebuilt, recompressed or
+    rehashed per request, and conditional requests short-circuit to 304.
+    """
+
+    __slots__ = ('body', 'variants', 'etag', 'mimetype')
+
+    def __init__(self, body, mimetype):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+
+        self.variants = compress_variants(body)
+
+    def make_response(self, request, cache_control=REVALIDATE_CACHE_CONTROL):
+        """Build the response for this request, honouring Accept-Encoding and If-None-Match"""
+        encoding = pick_encoding(request, self.variants)
+        # Each representation needs its own strong validator
+        etag = f'{self.etag}-{encoding}' if encoding else self.etag
+
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+
+        if encoding:
+            headers['Content-Encoding'] = encoding
+            body = self.variants[encoding]
+        else:
+            body = self.body
+
+        return Response(body, mimetype=self.mimetype, headers=headers)
@@ -0,0 +1,97 @@
+import random
+import time
+from functools import wraps
+from flask import g, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from engine_profiles import engine_options
+
+
+STICKY_SESSION_KEY = 'db_primary_until'
+
+
+def replica_binds(urls, profile='auto'):
+    """SQLALCHEMY_BINDS entries for the configured replica URLs"""
+    return {f'replica_{index}': {'url': url, **engine_options(url, profile)}
+            for index, url in enumerate(urls)}
+
+
+class RoutingSession(Session):
+    """Session that reads from the replica chosen for the current request.
+
+    Flushes, and anything outside a ``read_only`` view, use the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context():
+            engine = g.get('_replica_engine')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Routes read-only public views to read replicas.
+
+    Replicas are the ``replica_*`` binds built from DATABASE_REPLICA_URLS.
+    A view opts in with ``read_only``; everything else, including every admin
+    view and all background jobs, stays on the primary. A request that writes
+    pins its browser session to the primary for REPLICA_STICKY_SECONDS so the
+    writer reads their own changes, and ``last_write()`` (a Unix timestamp)
+    sends everyone to the primary for REPLICA_MAX_LAG_SECONDS after any
+    write, so version-keyed caches are never filled from a lagging replica.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.bind_keys = ()
+        self.sticky_seconds = 0
+        self.max_lag = 0
+        self.last_write = None
+
+    def init_app(self, app, db, last_write=None):
+        self.db = db
+        self.bind_keys = tuple(key for key in app.config.get('SQLALCHEMY_BINDS') or ()
+                               if key.startswith('replica_'))
+        self.sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', 10)
+        self.max_lag = app.config.get('REPLICA_MAX_LAG_SECONDS', 5)
+        self.last_write = last_write
+        app.extensions['replicas'] = self
+
+        if self.bind_keys:
+            event.listen(RoutingSession, 'after_flush', self._mark_write)
+            event.listen(RoutingSession, 'do_orm_execute', self._mark_bulk_write)
+            app.after_request(self._stick_to_primary)
+
+    @property
+    def enabled(self):
+        return bool(self.bind_keys)
+
+    def _must_use_primary(self):
+        if session.get(STICKY_SESSION_KEY, 0) > time.time():
+            return True
+        return self.last_write is not None and time.time() - self.last_write() < self.max_lag
+
+    def read_only(self, view):
+        """Serve a view's queries from a replica when it is safe to"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if self.bind_keys and not self._must_use_primary():
+                g._replica_engine = self.db.engines[random.choice(self.bind_keys)]
+            return view(*args, **kwargs)
+        return wrapper
+
+    @staticmethod
+    def _mark_write(db_session, flush_context):
+        if has_request_context():
+            g._db_wrote = True
+
+    @staticmethod
+    def _mark_bulk_write(state):
+        if has_request_context() and (state.is_insert or state.is_update or state.is_delete):
+            g._db_wrote = True
+
+    def _stick_to_primary(self, response):
+        if g.get('_db_wrote'):
+            session[STICKY_SESSION_KEY] = time.time() + self.sticky_seconds
+        return response
@@ -0,0 +1,192 @@
+import re
+from html import escape
+from markupsafe import Markup
+from sqlalchemy import inspect, text
+
+
+# Markers wrapped around matched terms by the database, replaced after escaping
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+TERM = re.compile(r'\w+', re.UNICODE)
+
+
+# The triggers copy post.plain_text (kept up to date by Post.refresh_derived_fields),
+# so writes from outside the app, e.g. the sqlite3 shell, need no custom functions
+SQLITE_SETUP = [
+    # Replaced rather than kept, so older trigger definitions never linger
+    'DROP TRIGGER IF EXISTS post_fts_insert',
+    'DROP TRIGGER IF EXISTS post_fts_update',
+    'DROP TRIGGER IF EXISTS post_fts_delete',
+    """CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5(
+        title, body, tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER post_fts_insert AFTER INSERT ON post BEGIN
+        INSERT INTO post_fts(rowid, title, body) VALUES (new.id, new.title, new.plain_text);
+    END""",
+    """CREATE TRIGGER post_fts_update AFTER UPDATE OF title, plain_text ON post BEGIN
+        DELETE FROM post_fts WHERE rowid = old.id;
+        INSERT INTO post_fts(rowid, title, body) VALUES (new.id, new.title, new.plain_text);
+    END""",
+    """CREATE TRIGGER post_fts_delete AFTER DELETE ON post BEGIN
+        DELETE FROM post_fts WHERE rowid = old.id;
+    END""",
+]
+
+SQLITE_FILL = 'INSERT INTO post_fts(rowid, title, body) SELECT id, title, plain_text FROM post'
+
+POSTGRES_SETUP = [
+    """ALTER TABLE post ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', regexp_replace(coalesce(content, ''), '<[^>]+>', ' ', 'g')), 'B')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_post_search_vector ON post USING GIN (search_vector)",
+]
+
+SQLITE_QUERY = text(f"""
+    SELECT post.id, post.title, post.featured_image, post.created_at, post.reading_time,
+           snippet(post_fts, 1, '{MATCH_START}', '{MATCH_END}', '...', 24) AS snippet
+    FROM post_fts JOIN post ON post.id = post_fts.rowid
+    WHERE post_fts MATCH :query
+    ORDER BY bm25(post_fts, 10.0, 1.0)
+    LIMIT :limit OFFSET :offset
+""")
+
+# Rank on the GIN index first, then build headlines only for the page being shown
+POSTGRES_QUERY = text(f"""
+    SELECT post.id, post.title, post.featured_image, post.created_at, post.reading_time,
+           ts_headline('english', regexp_replace(post.content, '<[^>]+>', ' ', 'g'), ranked.query,
+                       'StartSel={MATCH_START}, StopSel={MATCH_END}, MaxFragments=1, MaxWords=30, MinWords=12') AS snippet
+    FROM (
+        SELECT post.id, ts_rank_cd(post.search_vector, query) AS rank, query
+        FROM post, websearch_to_tsquery('english', :query) AS query
+        WHERE post.search_vector @@ query
+        ORDER BY rank DESC, post.id DESC
+        LIMIT :limit OFFSET :offset
+    ) AS ranked JOIN post ON post.id = ranked.id
+    ORDER BY ranked.rank DESC, post.id DESC
+""")
+
+
+class SearchIndex:
+    """Full-text search over post titles and bodies.
+
+    Uses an FTS5 table that triggers fill from ``post.plain_text`` on SQLite
+    and a generated, GIN-indexed tsvector column on PostgreSQL. Other
+    backends fall back to a LIKE scan so the /search page keeps working,
+    just without ranking.
+    """
+
+    def __init__(self):
+        self.backend = None
+
+    def setup(self, engine):
+        """Create the index structures if missing and fill them for existing posts"""
+        dialect = engine.dialect.name
+        if dialect == 'sqlite':
+            self.backend = self._setup_sqlite(engine)
+        elif dialect == 'postgresql':
+            with engine.begin() as conn:
+                for statement in POSTGRES_SETUP:
+                    conn.execute(text(statement))
+            self.backend = 'postgresql'
+        else:
+            self.backend = 'like'
+
+    def detect(self, engine):
+        """Pick the backend from index structures already in the database, without DDL"""
+        dialect = engine.dialect.name
+        inspector = inspect(engine)
+        if dialect == 'sqlite' and inspector.has_table('post_fts'):
+            self.backend = 'sqlite'
+        elif dialect == 'postgresql' and any(column['name'] == 'search_vector'
+                                             for column in inspector.get_columns('post')):
+            self.backend = 'postgresql'
+        else:
+            self.backend = 'like'
+
+    def _setup_sqlite(self, engine):
+        try:
+            with engine.begin() as conn:
+                created = not conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'post_fts'"
+                )).first()
+                for statement in SQLITE_SETUP:
+                    conn.execute(text(statement))
+                if created:
+                    conn.execute(text(SQLITE_FILL))
+        except Exception:
+            # SQLite builds without FTS5 still get a working, unranked search
+            return 'like'
+        return 'sqlite'
+
+    def rebuild(self, engine):
+        """Re-index every post from scratch; returns False when the backend keeps no separate index"""
+        if self.backend is None:
+            self.detect(engine)
+        if self.backend != 'sqlite':
+            return False
+        with engine.begin() as conn:
+            conn.execute(text('DELETE FROM post_fts'))
+            conn.execute(text(SQLITE_FILL))
+        return True
+
+    def search(self, session, query, page=1, per_page=10):
+        """Return (results, has_next) for one page of ranked matches"""
+        if self.backend is None:
+            self.detect(session.get_bind())
+        params = {'limit': per_page + 1, 'offset': (page - 1) * per_page}
+
+        if self.backend == 'sqlite':
+            match = fts5_query(query)
+            if not match:
+                return [], False
+            rows = session.execute(SQLITE_QUERY, dict(params, query=match)).all()
+        elif self.backend == 'postgresql':
+            rows = session.execute(POSTGRES_QUERY, dict(params, query=query)).all()
+        else:
+            rows = self._like_search(session, query, params)
+
+        # Only the LIKE fallback returns stored excerpts instead of database snippets
+        trusted = self.backend not in ('sqlite', 'postgresql')
+        results = [SearchResult(row, trusted) for row in rows[:per_page]]
+        return results, len(rows) > per_page
+
+    def _like_search(self, session, query, params):
+        terms = TERM.findall(query)
+        if not terms:
+            return []
+        clauses = ' AND '.join(f'(title LIKE :t{i} OR content LIKE :t{i})' for i in range(len(terms)))
+        params.update({f't{i}': f'%{term}%' for i, term in enumerate(terms)})
+        return session.execute(text(
+            'SELECT id, title, featured_image, created_at, reading_time, excerpt AS snippet '
+            f'FROM post WHERE {clauses} ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset'
+        ), params).all()
+
+
+class SearchResult:
+    __slots__ = ('id', 'title', 'featured_image', 'created_at', 'reading_time', 'snippet')
+
+    def __init__(self, row, trusted=False):
+        self.id = row.id
+        self.title = row.title
+        self.featured_image = row.featured_image
+        self.created_at = row.created_at
+        self.reading_time = row.reading_time
+        self.snippet = Markup(row.snippet or '') if trusted else highlight(row.snippet or '')
+
+
+def fts5_query(query):
+    """Turn free text into a safe FTS5 expression: every term required, last one as a prefix"""
+    terms = TERM.findall(query)
+    if not terms:
+        return ''
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def highlight(snippet):
+    """Escape a snippet and turn the database match markers into <mark> elements"""
+    escaped = escape(snippet, quote=False)
+    return Markup(escaped.replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>'))
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+from flask import render_template, url_for
+from precompiled import PrecompiledResponse
+from versions import VersionedMemo
+
+
+# Static files every visitor needs; precached under content-hashed URLs
+PRECACHE_FILES = (
+    'css/style.css',
+)
+
+# LRU limits (entries) for the runtime caches
+CACHE_LIMITS = {
+    'pages': 30,
+    'posts': 100,
+    'assets': 60,
+}
+
+
+class StaticHashes:
+    """Content hashes of files (static files, the worker template), recomputed only when a file changes"""
+
+    def __init__(self):
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def get(self, folder, filename):
+        return self.stamp(folder, filename)[0]
+
+    def stamp(self, folder, filename):
+        """(content hash, mtime in nanoseconds) of a file"""
+        path = os.path.join(folder, filename)
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self._hashes.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1], stamp[0]
+
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        with self._lock:
+            self._hashes[path] = (stamp, digest)
+        return digest, stamp[0]
+
+
+class ServiceWorker:
+    """Builds the site's single service worker script from templates/service-worker.js.
+
+    The precache list carries content-hashed URLs and the script embeds a
+    build hash of everything it precaches, so a deploy that changes any of
+    them changes the script, which makes browsers install the new worker and
+    drop the old caches. The script is rendered once per build hash.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.hashes = StaticHashes()
+        self._compiled = VersionedMemo()
+        self._templates = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.add_template_global(self.static_url)
+        app.extensions['service_worker'] = self
+
+    def static_url(self, filename, **values):
+        """``url_for('static', ...)`` with a content hash, safe to cache indefinitely"""
+        values['v'] = self.hashes.get(self.app.static_folder, filename)
+        return url_for('static', filename=filename, **values)
+
+    def precache_urls(self):
+        urls = [self.static_url(filename) for filename in PRECACHE_FILES]
+        # Built bundles and theme icons carry their own fingerprints
+        for name in ('assets', 'theme_icons'):
+            extension = self.app.extensions.get(name)
+            if extension is not None:
+                urls += extension.precache_urls()
+        return urls
+
+    def build(self):
+        """(build id, build time) of the deployed templates and static assets.
+
+        Pages depend on these as much as on their data, so conditional GET
+        validators include them: a deploy that changes a template or bundle
+        changes every ETag and moves Last-Modified forward.
+        """
+        template_folder = os.path.join(self.app.root_path, self.app.template_folder)
+        if self._templates is None:
+            self._templates = sorted(self.app.jinja_env.list_templates())
+        stamps = [self.hashes.stamp(template_folder, name) for name in self._templates]
+        stamps += [self.hashes.stamp(self.app.static_folder, name) for name in PRECACHE_FILES]
+        # Bundle URLs carry the asset manifest's fingerprints
+        urls = self.precache_urls()
+        assets = self.app.extensions.get('assets')
+        if assets is not None and assets.built:
+            stamps.append(self.hashes.stamp(*os.path.split(assets.manifest_path)))
+
+        build = hashlib.sha256(repr((urls, [digest for digest, _ in stamps])).encode('utf-8')).hexdigest()[:12]
+        built_at = max(mtime for _, mtime in stamps)
+        return build, datetime.fromtimestamp(built_at / 1e9, tz=timezone.utc).replace(tzinfo=None)
+
+    def compiled(self):
+        # The template's hash is only recomputed when its mtime or size changes
+        template_folder = os.path.join(self.app.root_path, self.app.template_folder)
+        key = (tuple(self.precache_urls()), self.hashes.get(template_folder, 'service-worker.js'))
+        return self._compiled.get(key, lambda: self._render(*key))
+
+    def _render(self, urls, template_hash):
+        build = hashlib.sha256(repr((urls, CACHE_LIMITS, template_hash)).encode('utf-8')).hexdigest()[:12]
+        body = render_template('service-worker.js', build=build, precache=list(urls), limits=CACHE_LIMITS)
+        return PrecompiledResponse(body, 'text/javascript')
@@ -0,0 +1,74 @@
+from versions import VersionedMemo
+
+
+SETTINGS_FIELDS = (
+    'blog_title',
+    'blog_description',
+    'primary_color',
+    'secondary_color',
+    'background_color',
+    'overall_background',
+    'card_background',
+    'text_color',
+    'navbar_color',
+    'updated_at',
+)
+
+
+class SettingsSnapshot:
+    """Immutable copy of the SiteSettings row, safe to share between requests and threads"""
+
+    __slots__ = SETTINGS_FIELDS + ('version',)
+
+    def __init__(self, version, **values):
+        object.__setattr__(self, 'version', version)
+        for field in SETTINGS_FIELDS:
+            object.__setattr__(self, field, values.get(field))
+
+    @classmethod
+    def from_model(cls, settings, version):
+        return cls(version, **{field: getattr(settings, field) for field in SETTINGS_FIELDS})
+
+    def __setattr__(self, name, value):
+        raise AttributeError('SettingsSnapshot is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('SettingsSnapshot is immutable')
+
+    def __repr__(self):
+        return f'<SettingsSnapshot v{self.version}: {self.blog_title}>'
+
+
+class SettingsCache:
+    """Per-process settings snapshot, reloaded only when the 'settings' version changes"""
+
+    VERSION_KEY = 'settings'
+
+    def __init__(self, versions, loader):
+        self.versions = versions
+        self.loader = loader
+        self._memo = VersionedMemo()
+
+    @property
+    def version(self):
+        return self.versions.get(self.VERSION_KEY)
+
+    def get(self):
+        version = self.version
+        return self._memo.get(version, lambda: SettingsSnapshot.from_model(self.loader(), version))
+
+    def memoize(self, builder):
+        """Wrap ``builder(snapshot)`` so it runs once per settings version"""
+        memo = VersionedMemo()
+
+        def wrapper():
+            snapshot = self.get()
+            return memo.get(snapshot.version, lambda: builder(snapshot))
+
+        wrapper.__name__ = builder.__name__
+        wrapper.__doc__ = builder.__doc__
+        return wrapper
+
+    def invalidate(self):
+        """Bump the shared version so every worker reloads on its next request"""
+        return self.versions.bump(self.VERSION_KEY)
@@ -0,0 +1,180 @@
+// Generated by the server; build {{ build }}
+const BUILD = {{ build|tojson }};
+const PRECACHE = {{ precache|tojson }};
+const LIMITS = {{ limits|tojson }};
+
+const PRECACHE_CACHE = `precache-${BUILD}`;
+const PAGES_CACHE = 'pages';
+const POSTS_CACHE = 'posts';
+const ASSETS_CACHE = 'assets';
+const META_CACHE = 'sw-meta';
+const OFFLINE_POSTS_KEY = '/__sw/offline-posts';
+const ADMIN_KEY = '/__sw/admin';
+const KNOWN_CACHES = [PRECACHE_CACHE, PAGES_CACHE, POSTS_CACHE, ASSETS_CACHE, META_CACHE];
+
+// Never cached: admin pages, personal certificates and form posts
+const BYPASS = [/^\/admin\b/, /^\/certificate\/(t|verify)\//, /^\/generate_certificate\b/, /^\/service-worker\.js$/];
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(PRECACHE_CACHE)
+            .then(cache => cache.addAll(PRECACHE))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    // Drop precaches from older builds and caches left by earlier workers
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(
+                names.filter(name => !KNOWN_CACHES.includes(name)).map(name => caches.delete(name))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('message', event => {
+    if (event.data && event.data.type === 'offline-posts') {
+        event.waitUntil(setOfflinePosts(Boolean(event.data.enabled), event.data.url));
+    } else if (event.data && event.data.type === 'audience') {
+        event.waitUntil(setFlag(ADMIN_KEY, Boolean(event.data.admin)));
+    }
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== self.location.origin) {
+        return;
+    }
+    if (BYPASS.some(pattern => pattern.test(url.pathname))) {
+        return;
+    }
+
+    if (PRECACHE.includes(url.pathname + url.search)) {
+        event.respondWith(cacheFirst(request, PRECACHE_CACHE));
+    } else if (/^\/(static|assets|images)\//.test(url.pathname)) {
+        event.respondWith(cacheFirst(request, ASSETS_CACHE));
+    } else if (request.mode === 'navigate' || url.pathname === '/dynamic-styles.css') {
+        event.respondWith(staleWhileRevalidate(event, request));
+    }
+});
+
+async function cacheFirst(request, cacheName) {
+    const cache = await caches.open(cacheName);
+    const cached = await cache.match(request);
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok) {
+        await cache.put(request, response.clone());
+        if (LIMITS[cacheName]) {
+            await trim(cache, LIMITS[cacheName]);
+        }
+    }
+    return response;
+}
+
+// Answer from cache at once and refresh the entry in the background,
+// so repeat visits are instant and at most one visit behind
+async function staleWhileRevalidate(event, request) {
+    const url = new URL(request.url);
+    const isPost = url.pathname.startsWith('/post/');
+    const pages = await caches.open(PAGES_CACHE);
+
+    let source = PAGES_CACHE;
+    let cached = await pages.match(request);
+    if (!cached && isPost) {
+        source = POSTS_CACHE;
+        cached = await caches.match(request, {cacheName: POSTS_CACHE});
+    }
+
+    const refresh = fetch(request).then(async response => {
+        if (isShareable(response)) {
+            await store(pages, request, response.clone(), LIMITS[PAGES_CACHE]);
+            if (isPost && await offlinePostsEnabled()) {
+                await store(await caches.open(POSTS_CACHE), request, response.clone(), LIMITS[POSTS_CACHE]);
+            }
+        }
+        return response;
+    });
+
+    // Admins see their own edits straight away; the cache is only their offline fallback
+    if (cached && await getFlag(ADMIN_KEY)) {
+        return refresh.catch(() => cached);
+    }
+    if (cached) {
+        // Offline, the refresh fails; still mark the entry as recently used
+        const copy = cached.clone();
+        event.waitUntil(refresh.catch(async () => store(await caches.open(source), request, copy, LIMITS[source])));
+        return cached;
+    }
+    try {
+        return await refresh;
+    } catch (error) {
+        return offlineResponse();
+    }
+}
+
+async function store(cache, request, response, limit) {
+    // Re-inserting moves the entry to the end of keys(), which is the LRU order
+    await cache.delete(request);
+    await cache.put(request, response);
+    await trim(cache, limit);
+}
+
+async function trim(cache, limit) {
+    const keys = await cache.keys();
+    for (const key of keys.slice(0, Math.max(0, keys.length - limit))) {
+        await cache.delete(key);
+    }
+}
+
+// Only public pages the server lets caches keep (and can revalidate) are stored;
+// admin pages are private and pages showing flashed messages carry no ETag
+function isShareable(response) {
+    const cacheControl = response.headers.get('Cache-Control') || '';
+    return response.ok && response.headers.has('ETag') && !/private|no-store/.test(cacheControl);
+}
+
+async function getFlag(key) {
+    const meta = await caches.open(META_CACHE);
+    return Boolean(await meta.match(key));
+}
+
+async function setFlag(key, enabled) {
+    const meta = await caches.open(META_CACHE);
+    if (enabled) {
+        await meta.put(key, new Response('1'));
+    } else {
+        await meta.delete(key);
+    }
+}
+
+function offlinePostsEnabled() {
+    return getFlag(OFFLINE_POSTS_KEY);
+}
+
+async function setOfflinePosts(enabled, currentUrl) {
+    await setFlag(OFFLINE_POSTS_KEY, enabled);
+    if (!enabled) {
+        await caches.delete(POSTS_CACHE);
+    } else if (currentUrl && currentUrl.startsWith('/post/')) {
+        // Save the post being read now, not only the next ones
+        const response = await fetch(currentUrl);
+        if (isShareable(response)) {
+            await store(await caches.open(POSTS_CACHE), currentUrl, response, LIMITS[POSTS_CACHE]);
+        }
+    }
+}
+
+function offlineResponse() {
+    return new Response(
+        '<!DOCTYPE html><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">'
+        + '<title>Offline</title><p style="font-family: sans-serif; padding: 2rem">'
+        + 'You are offline and this page has not been saved. Try again once you are back online.</p>',
+        {status: 503, headers: {'Content-Type': 'text/html; charset=utf-8'}}
+    );
+}
@@ -0,0 +1,95 @@
+"""Read-replica routing against two local SQLite files.
+
+The replica file is never written by the app, so it stands in for a replica
+that lags behind the primary: rows only in the primary show which database a
+read used.
+"""
+import time
+import pytest
+from flask import Flask, jsonify
+from models import db, Post
+from replicas import ReplicaRouter, replica_binds
+
+
+@pytest.fixture
+def clock():
+    # Unix time of the last write anywhere, as the version registry would report it
+    return {'last_write': 0.0}
+
+
+@pytest.fixture
+def app(tmp_path, clock):
+    app = Flask(__name__)
+    app.config.update(
+        SECRET_KEY='test',
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "primary.db"}',
+        SQLALCHEMY_BINDS=replica_binds([f'sqlite:///{tmp_path / "replica.db"}']),
+        REPLICA_STICKY_SECONDS=10,
+        REPLICA_MAX_LAG_SECONDS=5,
+    )
+    db.init_app(app)
+    router = ReplicaRouter()
+    router.init_app(app, db, last_write=lambda: clock['last_write'])
+
+    @app.route('/titles')
+    @router.read_only
+    def titles():
+        return jsonify(sorted(db.session.execute(db.select(Post.title)).scalars()))
+
+    @app.route('/posts', methods=['POST'])
+    def add_post():
+        db.session.add(Post(title='new', content='<p>new</p>'))
+        db.session.commit()
+        return '', 204
+
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica_0'])
+        db.session.add(Post(title='shared', content='<p>shared</p>'))
+        db.session.commit()
+        with db.engines['replica_0'].begin() as conn:
+            conn.execute(Post.__table__.insert().values(title='shared', content='<p>shared</p>'))
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_reads_use_the_replica_without_recent_writes(app):
+    with app.app_context():
+        with db.engines['replica_0'].begin() as conn:
+            conn.execute(Post.__table__.insert().values(title='replica only', content=''))
+
+    assert app.test_client().get('/titles').json == ['replica only', 'shared']
+
+
+def test_writer_reads_from_the_primary_after_a_write(app):
+    client = app.test_client()
+    assert client.post('/posts').status_code == 204
+
+    # The replica has not caught up, but this session is pinned to the primary
+    assert client.get('/titles').json == ['new', 'shared']
+    # Other visitors still read the replica
+    assert app.test_client().get('/titles').json == ['shared']
+
+
+def test_sticky_session_expires(app):
+    client = app.test_client()
+    client.post('/posts')
+    with client.session_transaction() as session:
+        session['db_primary_until'] = time.time() - 1
+
+    assert client.get('/titles').json == ['shared']
+
+
+def test_everyone_reads_the_primary_within_the_max_lag(app, clock):
+    with app.app_context():
+        db.session.add(Post(title='new', content='<p>new</p>'))
+        db.session.commit()
+
+    clock['last_write'] = time.time()
+    assert app.test_client().get('/titles').json == ['new', 'shared']
+
+    clock['last_write'] = time.time() - 6
+    assert app.test_client().get('/titles').json == ['shared']
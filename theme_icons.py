@@ -0,0 +1,75 @@
+import hashlib
+import threading
+from flask import Response, abort, redirect, url_for
+from artifact_cache import MemoryLRU
+from generate_icons import normalize_colors, render_icons
+from precompiled import IMMUTABLE_CACHE_CONTROL
+
+
+class ThemeIcons:
+    """PWA icons in the site's current theme colours, generated on demand.
+
+    Icon URLs embed the colour pair, so they are served as immutable; the
+    ``max_sets`` most recently used sets are kept in memory. Requests for a
+    pair other than the current one redirect to the current icons, so
+    arbitrary pairs are never generated.
+    """
+
+    def __init__(self, max_sets=4):
+        self.app = None
+        self.colors = None
+        self._sets = MemoryLRU(max_sets, size=lambda icons: 1)
+        self._lock = threading.Lock()
+
+    def init_app(self, app, colors):
+        """``colors()`` returns the current (primary, secondary) colours"""
+        self.app = app
+        self.colors = colors
+        app.add_template_global(self.icon_url)
+        app.extensions['theme_icons'] = self
+
+    @staticmethod
+    def slug(color1, color2):
+        color1, color2 = normalize_colors(color1, color2)
+        return f'{color1[1:]}-{color2[1:]}'
+
+    def current_slug(self):
+        return self.slug(*self.colors())
+
+    def icon_url(self, filename):
+        return url_for('theme_icon', colors=self.current_slug(), filename=filename)
+
+    def precache_urls(self):
+        return [self.icon_url(f'icon-{size}x{size}.png') for size in (32, 192, 512)]
+
+    def icon_set(self, slug):
+        """{filename: (PNG bytes, ETag)} for a colour slug, generated once"""
+        icons = self._sets.get(slug)
+        if icons is None:
+            with self._lock:
+                icons = self._sets.get(slug)
+                if icons is None:
+                    color1, color2 = (f'#{part}' for part in slug.split('-'))
+                    icons = {name: (data, hashlib.sha256(data).hexdigest()[:32])
+                             for name, data in render_icons(color1, color2).items()}
+                    self._sets.set(slug, icons)
+        return icons
+
+    def warm(self, color1, color2):
+        """Generate the set for new theme colours now, so no visitor waits for it"""
+        self.icon_set(self.slug(color1, color2))
+
+    def send(self, request, slug, filename):
+        current = self.current_slug()
+        if slug != current:
+            # Old colours (or junk): point at the current icons without caching the redirect
+            response = redirect(url_for('theme_icon', colors=current, filename=filename))
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        icon = self.icon_set(current).get(filename)
+        if icon is None:
+            abort(404)
+        response = Response(icon[0], mimetype='image/png')
+        response.set_etag(icon[1])
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response.make_conditional(request)
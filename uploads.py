@@ -0,0 +1,176 @@
+import hashlib
+import os
+import re
+import threading
+import uuid
+from flask import abort, send_file
+from jobs import LazyThreadPool
+from precompiled import IMMUTABLE_CACHE_CONTROL
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # uploads are refused without Pillow; image URLs still work
+    Image = None
+
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Formats accepted from admins (MPO is what many phone cameras write)
+ACCEPTED_FORMATS = {'JPEG', 'MPO', 'PNG', 'WEBP', 'GIF', 'AVIF', 'BMP', 'TIFF'}
+
+STORED_NAME = re.compile(r'^([0-9a-f]{64})\.(jpg|png)$')
+
+
+class InvalidUpload(ValueError):
+    """The uploaded file is not an image we can store"""
+
+
+class ImageUploads:
+    """Featured images uploaded by admins, stored once per distinct content.
+
+    The upload is copied to disk in chunks while it is hashed. If an image
+    with that hash is already stored (or still being processed) the copy is
+    dropped straight away, so re-using an image costs no storage or work.
+    New images are only checked in the request; applying the EXIF
+    orientation, stripping metadata and scaling down oversized originals
+    happen on a small thread pool, which writes ``<sha256>.jpg`` (``.png``
+    when the image has transparency) atomically.
+    """
+
+    URL_PREFIX = '/uploads/'
+
+    def __init__(self):
+        self.app = None
+        self.directory = None
+        self.pool = LazyThreadPool('blog-upload')
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app, images=None):
+        self.app = app
+        self.directory = app.config.get('IMAGE_UPLOAD_DIR') or os.path.join(app.instance_path, 'uploads')
+        self.max_bytes = app.config.get('IMAGE_UPLOAD_MAX_BYTES', 25 * 1024 * 1024)
+        self.max_dimension = app.config.get('IMAGE_UPLOAD_MAX_DIMENSION', 3200)
+        self.max_pixels = app.config.get('IMAGE_MAX_PIXELS', 50_000_000)
+        self.pool.max_workers = app.config.get('IMAGE_UPLOAD_WORKERS', 2)
+        if images is not None:
+            # Resized variants of uploads are read straight from this folder
+            images.add_local_root(self.URL_PREFIX, self.path_for)
+        app.extensions['image_uploads'] = self
+
+    @property
+    def enabled(self):
+        return Image is not None
+
+    def save(self, file):
+        """Store an uploaded image and return its URL; processing finishes in the background"""
+        if not self.enabled:
+            raise InvalidUpload('Image uploads need Pillow installed on the server.')
+        os.makedirs(self.directory, exist_ok=True)
+
+        tmp_path = os.path.join(self.directory, f'.incoming-{uuid.uuid4().hex}')
+        try:
+            digest = self._copy(file.stream, tmp_path)
+            name = self._stored_name(digest)
+            if name is None:
+                name = f'{digest}.{self._probe(tmp_path)}'
+                with self._lock:
+                    if digest not in self._pending:
+                        self._pending[digest] = (name, self.pool.submit(self._process, tmp_path, name))
+                        tmp_path = None
+        finally:
+            if tmp_path is not None:
+                _remove(tmp_path)
+        return self.URL_PREFIX + name
+
+    def path_for(self, name, timeout=60):
+        """Path of a stored upload, waiting for it if this worker is still processing it"""
+        match = STORED_NAME.match(name)
+        if not match:
+            return None
+        pending = self._pending.get(match.group(1))
+        if pending is not None:
+            try:
+                pending[1].result(timeout)
+            except Exception:
+                return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def send(self, name):
+        path = self.path_for(name)
+        if path is None:
+            abort(404)
+        response = send_file(path, conditional=True, etag=name.split('.')[0])
+        # Content-addressed, so the URL never changes meaning
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    def _copy(self, stream, path):
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'wb') as out:
+            while True:
+                chunk = stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise InvalidUpload(f'Images can be at most {self.max_bytes // (1024 * 1024)} MB.')
+                digest.update(chunk)
+                out.write(chunk)
+        if not size:
+            raise InvalidUpload('The uploaded file is empty.')
+        return digest.hexdigest()
+
+    def _stored_name(self, digest):
+        pending = self._pending.get(digest)
+        if pending is not None:
+            return pending[0]
+        for extension in ('jpg', 'png'):
+            if os.path.exists(os.path.join(self.directory, f'{digest}.{extension}')):
+                return f'{digest}.{extension}'
+        return None
+
+    def _probe(self, path):
+        """Check the header only (no decoding) and pick the stored format"""
+        try:
+            with Image.open(path) as img:
+                if img.format not in ACCEPTED_FORMATS:
+                    raise InvalidUpload(f'{img.format} images are not supported.')
+                if img.width * img.height > self.max_pixels:
+                    raise InvalidUpload('That image has too many pixels.')
+                has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+        except (OSError, Image.DecompressionBombError):
+            raise InvalidUpload('That file is not an image we can read.')
+        return 'png' if has_alpha else 'jpg'
+
+    def _process(self, tmp_path, name):
+        digest, extension = STORED_NAME.match(name).groups()
+        final_path = os.path.join(self.directory, name)
+        out_path = f'{final_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with Image.open(tmp_path) as img:
+                # Square bound, so it holds before and after rotation; lets JPEG decode scaled down
+                img.thumbnail((self.max_dimension, self.max_dimension), Image.LANCZOS)
+                img = ImageOps.exif_transpose(img)
+                if extension == 'png':
+                    img.convert('RGBA').save(out_path, 'PNG', optimize=True)
+                else:
+                    img.convert('RGB').save(out_path, 'JPEG', quality=90, optimize=True, progressive=True)
+            os.replace(out_path, final_path)
+        except Exception:
+            self.app.logger.exception('Processing uploaded image %s failed', name)
+            _remove(out_path)
+            raise
+        finally:
+            _remove(tmp_path)
+            with self._lock:
+                self._pending.pop(digest, None)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
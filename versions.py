@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+
+
+class VersionRegistry:
+    """Named version counters shared by every worker process on the host.
+
+    Each counter is a small file in the instance folder. Reading a version is a
+    single ``os.stat`` plus, only when the file changed, a tiny read, so it is
+    cheap enough to check on every request without touching the database.
+    Bumping writes a fresh nanosecond timestamp with an atomic rename, so two
+    workers bumping concurrently can never produce the same value twice.
+    """
+
+    def __init__(self, app=None):
+        self.directory = None
+        self._seen = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = app.config.get('VERSIONS_DIR') or os.path.join(app.instance_path, 'versions')
+        os.makedirs(self.directory, exist_ok=True)
+        app.extensions['versions'] = self
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def get(self, name):
+        """Return the current value of a counter, 0 if it was never bumped"""
+        path = self._path(name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return 0
+
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        cached = self._seen.get(name)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        try:
+            with open(path) as f:
+                value = int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+        self._seen[name] = (stamp, value)
+        return value
+
+    def bump(self, name):
+        """Advance a counter so every worker sees a new value on its next read"""
+        value = max(time.time_ns(), self.get(name) + 1)
+        tmp_path = f'{self._path(name)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(value))
+        os.replace(tmp_path, self._path(name))
+        return value
+
+
+class VersionedMemo:
+    """One value built for a version key and rebuilt, once per process, when the key changes.
+
+    Readers that see the current key never take the lock, so a hit is a
+    single comparison.
+    """
+
+    def __init__(self):
+        self._entry = None
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """The value for ``key``, calling ``build()`` if the stored value is for another key"""
+        entry = self._entry
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        with self._lock:
+            entry = self._entry
+            if entry is None or entry[0] != key:
+                entry = (key, build())
+                self._entry = entry
+        return entry[1]
@@ -0,0 +1,57 @@
+import json
+
+# Launcher names longer than this get truncated by most home screens
+SHORT_NAME_LENGTH = 12
+
+MANIFEST_DEFAULTS = {
+    'start_url': '/',
+    'scope': '/',
+    'display': 'standalone',
+    'orientation': 'portrait-primary',
+    'categories': ['education', 'productivity', 'lifestyle'],
+}
+
+ICON_SIZES = (72, 96, 128, 144, 152, 192, 384, 512)
+MASKABLE_ICON_SIZES = (192, 512)
+
+
+def short_name(title):
+    if len(title) <= SHORT_NAME_LENGTH:
+        return title
+    return title[:SHORT_NAME_LENGTH].rstrip()
+
+def build_web_manifest(settings, icon_url):
+    """Render manifest.json for a settings snapshot; ``icon_url(filename)`` links the theme icons"""
+    icons = [{'src': icon_url(f'icon-{size}x{size}.png'), 'sizes': f'{size}x{size}', 'type': 'image/png'}
+             for size in ICON_SIZES]
+    icons += [{'src': icon_url(f'maskable-icon-{size}x{size}.png'), 'sizes': f'{size}x{size}',
+               'type': 'image/png', 'purpose': 'maskable'}
+              for size in MASKABLE_ICON_SIZES]
+    shortcut_icons = [{'src': icon_url('icon-96x96.png'), 'sizes': '96x96'}]
+
+    manifest = {
+        'name': settings.blog_title,
+        'short_name': short_name(settings.blog_title),
+        'description': settings.blog_description,
+        'theme_color': settings.primary_color,
+        'background_color': settings.background_color,
+        **MANIFEST_DEFAULTS,
+        'icons': icons,
+        'shortcuts': [
+            {
+                'name': 'New Post',
+                'short_name': 'New Post',
+                'description': 'Create a new blog post',
+                'url': '/admin/new',
+                'icons': shortcut_icons,
+            },
+            {
+                'name': 'Dashboard',
+                'short_name': 'Dashboard',
+                'description': 'Admin dashboard',
+                'url': '/admin/dashboard',
+                'icons': shortcut_icons,
+            },
+        ],
+    }
+    return json.dumps(manifest, indent=2, ensure_ascii=False)